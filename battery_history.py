@@ -7,10 +7,56 @@ Battery History Manager
 import sqlite3
 import json
 import os
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
 from pathlib import Path
-import shutil
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    import orjson  # 선택적 의존성: JSON 백업 직렬화 가속
+except ImportError:
+    orjson = None
+
+# INSERT 컬럼 순서 (_build_*_row가 반환하는 튜플 순서와 일치해야 함)
+_MAC_COLUMNS = (
+    'timestamp', 'device_name', 'device_identifier', 'serial_number', 'os_version',
+    'current_capacity', 'max_capacity', 'design_capacity', 'cycle_count', 'battery_health',
+    'temperature', 'voltage', 'amperage', 'is_charging', 'fully_charged', 'external_connected',
+    'time_remaining', 'manufacture_date', 'battery_serial', 'condition',
+)
+_IOS_COLUMNS = (
+    'timestamp', 'device_id', 'device_name', 'device_model', 'ios_version', 'device_serial',
+    'storage_capacity', 'battery_charge', 'battery_health', 'full_charge_capacity',
+    'design_capacity', 'manufacture_date', 'charge_cycles', 'battery_temperature',
+    'charging_power', 'is_charging', 'last_seen', 'connection_type', 'device_key',
+)
+_MAC_INSERT_SQL = (
+    f"INSERT INTO mac_battery_history ({', '.join(_MAC_COLUMNS)}) "
+    f"VALUES ({', '.join('?' * len(_MAC_COLUMNS))})"
+)
+_IOS_INSERT_SQL = (
+    f"INSERT INTO ios_battery_history ({', '.join(_IOS_COLUMNS)}) "
+    f"VALUES ({', '.join('?' * len(_IOS_COLUMNS))})"
+)
+
+# 히스토리 조회 시 선택 가능한 컬럼 (columns 인자 화이트리스트)
+_HISTORY_COLUMNS = {
+    'mac_battery_history': frozenset(_MAC_COLUMNS) | {'id', 'data_version'},
+    'ios_battery_history': frozenset(_IOS_COLUMNS) | {'id', 'data_version'},
+}
+
+def _format_timestamp(dt: datetime) -> str:
+    """timestamp 컬럼 저장 형식 문자열 (기본 sqlite3 datetime 어댑터와 동일한 형식)"""
+    return dt.isoformat(sep=' ')
+
+# _safe_int의 64비트 2의 보수 변환용 상수
+_INT64_SIGN = 1 << 63
+_UINT64_MASK = (1 << 64) - 1
+
+# _parse_bool에서 True로 취급하는 문자열
+_TRUE_STRINGS = frozenset({'yes', 'true', '1'})
 
 class BatteryHistoryManager:
     def __init__(self, db_path: str = None):
@@ -41,14 +87,42 @@ class BatteryHistoryManager:
                 print(f"Warning: Failed to create backup directory: {e}")
                 self.backup_dir = None
             
+            # iOS device_id → ios_devices.id 캐시
+            self._ios_device_keys = {}
+            
+            # 하드웨어/OS 정보 캐시 (_get_device_identifier, _get_os_version)
+            self._device_identifier = None
+            self._os_version = None
+            
+            # JSON 백업 내보내기용 백그라운드 작업자 (create_backup 호출자를 블로킹하지 않음)
+            self._backup_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='battery-backup')
+            self._pending_backups = []
+            
+            # 단일 영구 연결 (매 호출마다 connect/PRAGMA 재실행 및 페이지 캐시 손실 방지)
+            self._lock = threading.RLock()
+            self._conn = self._connect()
             self._init_database()
         except Exception as e:
             print(f"Fatal error: Failed to initialize BatteryHistoryManager: {e}")
             raise
     
+    def _connect(self) -> sqlite3.Connection:
+        """PRAGMA 설정이 적용된 데이터베이스 연결 생성"""
+        # isolation_level=None: 자동 커밋, 트랜잭션은 명시적 BEGIN/COMMIT으로 관리
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        # WAL + synchronous=NORMAL: 커밋마다 발생하는 fsync 및 저널 재작성 제거
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-20000")  # 20 MB
+        conn.execute("PRAGMA mmap_size=268435456")  # 256 MB
+        return conn
+    
     def _init_database(self):
         """데이터베이스 초기화 및 테이블 생성"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._lock:
+            conn = self._conn
             cursor = conn.cursor()
             
             # Mac 배터리 히스토리 테이블
@@ -101,16 +175,42 @@ class BatteryHistoryManager:
                     is_charging BOOLEAN,
                     last_seen DATETIME,
                     connection_type TEXT,
-                    data_version TEXT DEFAULT '1.0'
+                    data_version TEXT DEFAULT '1.0',
+                    device_key INTEGER REFERENCES ios_devices(id)
                 )
             ''')
             
+            # iOS 디바이스 ID(UUID/시리얼) → 정수 대리 키 매핑 테이블
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS ios_devices (
+                    id INTEGER PRIMARY KEY,
+                    device_id TEXT UNIQUE NOT NULL
+                )
+            ''')
+            
+            # 기존 데이터베이스 마이그레이션: device_key 컬럼 추가 및 기존 행 채우기
+            ios_columns = {row['name'] for row in cursor.execute('PRAGMA table_info(ios_battery_history)')}
+            if 'device_key' not in ios_columns:
+                cursor.execute('ALTER TABLE ios_battery_history ADD COLUMN device_key INTEGER REFERENCES ios_devices(id)')
+                cursor.execute('INSERT OR IGNORE INTO ios_devices (device_id) SELECT DISTINCT device_id FROM ios_battery_history')
+                cursor.execute('''
+                    UPDATE ios_battery_history
+                    SET device_key = (SELECT id FROM ios_devices WHERE ios_devices.device_id = ios_battery_history.device_id)
+                ''')
+            
             # 인덱스 생성 (성능 최적화)
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_mac_timestamp ON mac_battery_history(timestamp)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_ios_timestamp ON ios_battery_history(timestamp)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_ios_device ON ios_battery_history(device_id)')
-            
-            conn.commit()
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_mac_device ON mac_battery_history(device_identifier, timestamp)')
+            # 차트 조회용 커버링 인덱스 (timestamp, battery_health, cycle_count만 읽는 경우 테이블 접근 불필요)
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_mac_chart ON mac_battery_history(timestamp, battery_health, cycle_count)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_ios_device_key ON ios_battery_history(device_key, timestamp)')
+            # 위 인덱스와 중복되는 기존 인덱스 제거 (삽입마다 유지 비용만 발생)
+            # idx_mac_timestamp: idx_mac_chart의 선두 컬럼과 동일 / idx_ios_device: device_key 인덱스로 대체
+            cursor.execute('DROP INDEX IF EXISTS idx_mac_timestamp')
+            cursor.execute('DROP INDEX IF EXISTS idx_ios_device')
+            # 월별 요약은 timestamp 범위 인덱스로 조회 (표현식 인덱스는 전체 스캔을 유발해 제거)
+            cursor.execute('DROP INDEX IF EXISTS idx_mac_month')
+            cursor.execute('DROP INDEX IF EXISTS idx_ios_dev_month')
     
     def save_mac_battery_data(self, battery_data: Dict) -> bool:
         """
@@ -118,187 +218,324 @@ class BatteryHistoryManager:
         
         Args:
             battery_data: 배터리 정보 딕셔너리
-            
+        
+        Returns:
+            bool: 저장 성공 여부
+        """
+        return self.save_mac_batch([battery_data])
+    
+    def save_ios_battery_data(self, device_data: Dict) -> bool:
+        """
+        iOS 디바이스 배터리 데이터 저장
+        
+        Args:
+            device_data: iOS 디바이스 정보 딕셔너리
+        
+        Returns:
+            bool: 저장 성공 여부
+        """
+        return self.save_ios_batch([device_data])
+    
+    def save_mac_batch(self, records: List[Dict]) -> bool:
+        """
+        여러 Mac 배터리 데이터를 단일 트랜잭션으로 저장
+        
+        Args:
+            records: 배터리 정보 딕셔너리 리스트
+        
         Returns:
             bool: 저장 성공 여부
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                # 현재 시간
-                timestamp = datetime.now()
-                
-                # 데이터 변환 및 정리
-                data = {
-                    'timestamp': timestamp,
-                    'device_name': battery_data.get('device_name'),
-                    'device_identifier': self._get_device_identifier(),
-                    'serial_number': battery_data.get('serial'),
-                    'os_version': self._get_os_version(),
-                    'current_capacity': self._safe_int(battery_data.get('apple_raw_current_capacity')),
-                    'max_capacity': self._safe_int(battery_data.get('apple_raw_max_capacity')),
-                    'design_capacity': self._safe_int(battery_data.get('design_capacity')),
-                    'cycle_count': self._safe_int(battery_data.get('cycle_count')),
-                    'battery_health': self._calculate_health(battery_data),
-                    'temperature': self._safe_float(battery_data.get('temperature')),
-                    'voltage': self._safe_float(battery_data.get('voltage')),
-                    'amperage': self._safe_int(battery_data.get('amperage')),
-                    'is_charging': self._parse_bool(battery_data.get('is_charging')),
-                    'fully_charged': self._parse_bool(battery_data.get('fully_charged')),
-                    'external_connected': self._parse_bool(battery_data.get('external_connected')),
-                    'time_remaining': self._safe_int(battery_data.get('time_remaining')),
-                    'manufacture_date': battery_data.get('manufacture_date'),
-                    'battery_serial': battery_data.get('serial'),
-                    'condition': battery_data.get('condition'),
-                }
-                
-                cursor.execute('''
-                    INSERT INTO mac_battery_history 
-                    (timestamp, device_name, device_identifier, serial_number, os_version,
-                     current_capacity, max_capacity, design_capacity, cycle_count, battery_health,
-                     temperature, voltage, amperage, is_charging, fully_charged, external_connected,
-                     time_remaining, manufacture_date, battery_serial, condition)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    data['timestamp'], data['device_name'], data['device_identifier'], 
-                    data['serial_number'], data['os_version'], data['current_capacity'],
-                    data['max_capacity'], data['design_capacity'], data['cycle_count'],
-                    data['battery_health'], data['temperature'], data['voltage'],
-                    data['amperage'], data['is_charging'], data['fully_charged'],
-                    data['external_connected'], data['time_remaining'], data['manufacture_date'],
-                    data['battery_serial'], data['condition']
-                ))
-                
-                conn.commit()
-                return True
-                
+            # 배치당 한 번만 시각을 구하고 문자열로 변환 (행마다 datetime 생성/어댑터 호출 방지)
+            timestamp = _format_timestamp(datetime.now())
+            rows = [self._build_mac_row(battery_data, timestamp) for battery_data in records]
+            self._insert_many(_MAC_INSERT_SQL, rows)
+            return True
+        
         except Exception as e:
             print(f"Mac 배터리 데이터 저장 오류: {e}")
             return False
     
-    def save_ios_battery_data(self, device_data: Dict) -> bool:
+    def save_ios_batch(self, records: List[Dict]) -> bool:
         """
-        iOS 디바이스 배터리 데이터 저장
+        여러 iOS 디바이스 배터리 데이터를 단일 트랜잭션으로 저장
         
         Args:
-            device_data: iOS 디바이스 정보 딕셔너리
-            
+            records: iOS 디바이스 정보 딕셔너리 리스트
+        
         Returns:
             bool: 저장 성공 여부
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                timestamp = datetime.now()
-                
-                data = {
-                    'timestamp': timestamp,
-                    'device_id': device_data.get('device_id', device_data.get('serial', 'unknown')),
-                    'device_name': device_data.get('name'),
-                    'device_model': device_data.get('model'),
-                    'ios_version': device_data.get('ios_version'),
-                    'device_serial': device_data.get('serial'),
-                    'storage_capacity': device_data.get('storage_capacity'),
-                    'battery_charge': self._safe_int(device_data.get('battery_capacity')),
-                    'battery_health': self._safe_float(device_data.get('battery_health')),
-                    'full_charge_capacity': self._safe_int(device_data.get('full_charge_capacity')),
-                    'design_capacity': self._safe_int(device_data.get('design_capacity')),
-                    'manufacture_date': device_data.get('manufacture_date'),
-                    'charge_cycles': self._safe_int(device_data.get('charge_cycles')),
-                    'battery_temperature': self._safe_float(device_data.get('battery_temperature')),
-                    'charging_power': self._safe_int(device_data.get('charging_power')),
-                    'is_charging': self._parse_bool(device_data.get('battery_charging')),
-                    'last_seen': timestamp,
-                    'connection_type': device_data.get('connection', 'USB'),
-                }
-                
-                cursor.execute('''
-                    INSERT INTO ios_battery_history 
-                    (timestamp, device_id, device_name, device_model, ios_version, device_serial,
-                     storage_capacity, battery_charge, battery_health, full_charge_capacity,
-                     design_capacity, manufacture_date, charge_cycles, battery_temperature,
-                     charging_power, is_charging, last_seen, connection_type)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    data['timestamp'], data['device_id'], data['device_name'],
-                    data['device_model'], data['ios_version'], data['device_serial'],
-                    data['storage_capacity'], data['battery_charge'], data['battery_health'],
-                    data['full_charge_capacity'], data['design_capacity'], data['manufacture_date'],
-                    data['charge_cycles'], data['battery_temperature'], data['charging_power'],
-                    data['is_charging'], data['last_seen'], data['connection_type']
-                ))
-                
-                conn.commit()
-                return True
-                
+            timestamp = _format_timestamp(datetime.now())
+            with self._lock:
+                rows = [self._build_ios_row(device_data, timestamp) for device_data in records]
+            self._insert_many(_IOS_INSERT_SQL, rows)
+            return True
+        
         except Exception as e:
             print(f"iOS 배터리 데이터 저장 오류: {e}")
             return False
     
-    def get_mac_history(self, days: int = 30) -> List[Dict]:
+    def save_batch(self, mac_data: Optional[Dict], ios_devices: List[Dict]) -> bool:
+        """
+        Mac 배터리 데이터와 iOS 디바이스 데이터를 단일 트랜잭션으로 저장 (새로고침당 커밋 1회)
+        
+        Args:
+            mac_data: Mac 배터리 정보 딕셔너리 (없으면 None)
+            ios_devices: iOS 디바이스 정보 딕셔너리 리스트
+        
+        Returns:
+            bool: 저장 성공 여부
+        """
+        try:
+            timestamp = _format_timestamp(datetime.now())
+            with self._lock:
+                # 행(및 새 디바이스 키 등록)은 BEGIN 전에 자동 커밋으로 준비 (트랜잭션 롤백과 무관)
+                mac_row = self._build_mac_row(mac_data, timestamp) if mac_data else None
+                ios_rows = []
+                for device_data in ios_devices or ():
+                    # 잘못된 디바이스 하나 때문에 Mac 및 다른 디바이스 기록을 잃지 않도록 개별 처리
+                    try:
+                        ios_rows.append(self._build_ios_row(device_data, timestamp))
+                    except Exception as e:
+                        print(f"iOS 디바이스 데이터 건너뜀: {e}")
+                with self.transaction() as conn:
+                    if mac_row is not None:
+                        conn.execute(_MAC_INSERT_SQL, mac_row)
+                    for row in ios_rows:
+                        # 바인딩 불가 값 등 행 단위 오류는 해당 문장만 실패하고 트랜잭션은 유지됨
+                        try:
+                            conn.execute(_IOS_INSERT_SQL, row)
+                        except sqlite3.Error as e:
+                            print(f"iOS 디바이스 데이터 건너뜀 ({row[1]}): {e}")  # row[1]: device_id
+            return True
+        
+        except Exception as e:
+            print(f"배터리 데이터 일괄 저장 오류: {e}")
+            return False
+    
+    @contextmanager
+    def transaction(self):
+        """
+        여러 저장 작업을 하나의 트랜잭션으로 묶는 컨텍스트 매니저 (커밋/fsync 1회)
+        
+        중첩 호출 시 바깥 트랜잭션 안에서 SAVEPOINT로 동작합니다.
+        
+        Example:
+            with history_manager.transaction():
+                history_manager.save_mac_battery_data(mac_data)
+                for device in ios_devices:
+                    history_manager.save_ios_battery_data(device)
+        """
+        with self._lock:
+            conn = self._conn
+            if conn.in_transaction:
+                conn.execute("SAVEPOINT nested_save")
+                try:
+                    yield conn
+                except BaseException:
+                    conn.execute("ROLLBACK TO nested_save")
+                    conn.execute("RELEASE nested_save")
+                    # 롤백된 ios_devices 등록이 캐시에 남지 않도록 비움
+                    self._ios_device_keys.clear()
+                    raise
+                conn.execute("RELEASE nested_save")
+                return
+            
+            conn.execute("BEGIN")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                # 롤백된 ios_devices 등록이 캐시에 남지 않도록 비움
+                self._ios_device_keys.clear()
+                raise
+            conn.execute("COMMIT")
+    
+    def _insert_many(self, sql: str, rows: List[Tuple]):
+        """여러 행을 단일 트랜잭션으로 삽입 - 커밋(fsync)은 1회"""
+        if not rows:
+            return
+        with self.transaction() as conn:
+            conn.executemany(sql, rows)
+    
+    def _build_mac_row(self, battery_data: Dict, timestamp: str) -> Tuple:
+        """Mac 배터리 데이터를 INSERT용 튜플로 변환 (_MAC_COLUMNS 순서)"""
+        # max_capacity/design_capacity 컬럼과 건강도 계산에서 같은 변환 결과 재사용
+        max_cap = self._safe_int(battery_data.get('apple_raw_max_capacity'))
+        design_cap = self._safe_int(battery_data.get('design_capacity'))
+        return (
+            timestamp,
+            battery_data.get('device_name'),
+            self._get_device_identifier(),
+            battery_data.get('serial'),
+            self._get_os_version(),
+            self._safe_int(battery_data.get('apple_raw_current_capacity')),
+            max_cap,
+            design_cap,
+            self._safe_int(battery_data.get('cycle_count')),
+            self._calculate_health(max_cap, design_cap),
+            self._safe_float(battery_data.get('temperature')),
+            self._safe_float(battery_data.get('voltage')),
+            self._safe_int(battery_data.get('amperage')),
+            self._parse_bool(battery_data.get('is_charging')),
+            self._parse_bool(battery_data.get('fully_charged')),
+            self._parse_bool(battery_data.get('external_connected')),
+            self._safe_int(battery_data.get('time_remaining')),
+            battery_data.get('manufacture_date'),
+            battery_data.get('serial'),
+            battery_data.get('condition'),
+        )
+    
+    def _build_ios_row(self, device_data: Dict, timestamp: str) -> Tuple:
+        """iOS 디바이스 데이터를 INSERT용 튜플로 변환 (_IOS_COLUMNS 순서)"""
+        device_id = device_data.get('device_id') or device_data.get('serial') or 'unknown'
+        return (
+            timestamp,
+            device_id,
+            device_data.get('name'),
+            device_data.get('model'),
+            device_data.get('ios_version'),
+            device_data.get('serial'),
+            device_data.get('storage_capacity'),
+            self._safe_int(device_data.get('battery_capacity')),
+            self._safe_float(device_data.get('battery_health')),
+            self._safe_int(device_data.get('full_charge_capacity')),
+            self._safe_int(device_data.get('design_capacity')),
+            device_data.get('manufacture_date'),
+            self._safe_int(device_data.get('charge_cycles')),
+            self._safe_float(device_data.get('battery_temperature')),
+            self._safe_int(device_data.get('charging_power')),
+            self._parse_bool(device_data.get('battery_charging')),
+            timestamp,  # last_seen
+            device_data.get('connection', 'USB'),
+            self._get_ios_device_key(device_id),
+        )
+    
+    def _get_ios_device_key(self, device_id: str) -> int:
+        """iOS device_id의 정수 대리 키 조회 (없으면 ios_devices에 등록)"""
+        device_key = self._ios_device_keys.get(device_id)
+        if device_key is None:
+            with self._lock:
+                self._conn.execute('INSERT OR IGNORE INTO ios_devices (device_id) VALUES (?)', (device_id,))
+                device_key = self._conn.execute(
+                    'SELECT id FROM ios_devices WHERE device_id = ?', (device_id,)
+                ).fetchone()[0]
+            self._ios_device_keys[device_id] = device_key
+        return device_key
+    
+    def _history_query(self, table: str, days: int, device_id: str = None,
+                       columns: Optional[Sequence[str]] = None) -> Tuple[str, Tuple]:
+        """히스토리 조회 SQL 및 파라미터 생성 (Mac/iOS 조회 공용)"""
+        cutoff_date = _format_timestamp(datetime.now() - timedelta(days=days))
+        
+        if columns:
+            unknown = set(columns) - _HISTORY_COLUMNS[table]
+            if unknown:
+                raise ValueError(f"알 수 없는 컬럼: {', '.join(sorted(unknown))}")
+            projection = ', '.join(columns)
+        else:
+            projection = '*'
+        
+        if device_id:
+            # 문자열 device_id 비교 대신 정수 대리 키(device_key) 인덱스 사용
+            return f'''
+                SELECT {projection} FROM {table}
+                WHERE device_key = (SELECT id FROM ios_devices WHERE device_id = ?)
+                  AND timestamp >= ?
+                ORDER BY timestamp DESC
+            ''', (device_id, cutoff_date)
+        
+        return f'''
+            SELECT {projection} FROM {table}
+            WHERE timestamp >= ?
+            ORDER BY timestamp DESC
+        ''', (cutoff_date,)
+    
+    def get_mac_history(self, days: int = 30, columns: Optional[Sequence[str]] = None) -> List[Dict]:
         """
         Mac 배터리 히스토리 조회
         
         Args:
             days: 조회할 일수 (기본값: 30일)
-            
+            columns: 조회할 컬럼 목록 (None이면 전체 컬럼)
+        
         Returns:
             List[Dict]: 히스토리 데이터 리스트
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
+            with self._lock:
+                conn = self._conn
                 cursor = conn.cursor()
-                
-                cutoff_date = datetime.now() - timedelta(days=days)
-                
-                cursor.execute('''
-                    SELECT * FROM mac_battery_history 
-                    WHERE timestamp >= ?
-                    ORDER BY timestamp DESC
-                ''', (cutoff_date,))
-                
+                cursor.execute(*self._history_query('mac_battery_history', days, columns=columns))
                 return [dict(row) for row in cursor.fetchall()]
-                
+        
         except Exception as e:
             print(f"Mac 히스토리 조회 오류: {e}")
             return []
     
-    def get_ios_history(self, device_id: str = None, days: int = 30) -> List[Dict]:
+    def get_mac_history_binned(self, days: int = 30, buckets: int = 500) -> Dict[str, Tuple]:
+        """
+        차트용 Mac 배터리 히스토리 조회 (SQLite에서 시간 구간별로 집계)
+        
+        Args:
+            days: 조회할 일수 (기본값: 30일)
+            buckets: 기간을 나눌 구간 수 (반환 행 수의 상한)
+        
+        Returns:
+            Dict[str, Tuple]: 컬럼별 값 튜플 (행 dict를 만들지 않는 컬럼 형식)
+                timestamp(구간 내 첫 기록 시각), battery_health(0을 제외한 평균), cycle_count(최댓값)
+        """
+        cutoff_date = _format_timestamp(datetime.now() - timedelta(days=days))
+        # 구간 폭 (초): 기간/구간 수보다 조금 넓게 잡아 구간 번호가 0 ~ buckets-1을 넘지 않게 함
+        width = days * 86400 // buckets + 1
+        
+        try:
+            with self._lock:
+                cursor = self._conn.cursor()
+                # sqlite3.Row 대신 튜플로 받아 컬럼별로 전치
+                cursor.row_factory = None
+                cursor.execute('''
+                    SELECT 
+                        MIN(timestamp) as timestamp,
+                        AVG(NULLIF(battery_health, 0)) as battery_health,
+                        MAX(cycle_count) as cycle_count
+                    FROM mac_battery_history 
+                    WHERE timestamp >= :cutoff
+                    GROUP BY (strftime('%s', timestamp) - strftime('%s', :cutoff)) / :width
+                    ORDER BY timestamp DESC
+                ''', {'cutoff': cutoff_date, 'width': width})
+                columns = [column[0] for column in cursor.description]
+                rows = cursor.fetchall()
+            
+            return dict(zip(columns, zip(*rows) if rows else ((),) * len(columns)))
+        
+        except Exception as e:
+            print(f"Mac 히스토리 구간 집계 조회 오류: {e}")
+            return {}
+    
+    def get_ios_history(self, device_id: str = None, days: int = 30,
+                        columns: Optional[Sequence[str]] = None) -> List[Dict]:
         """
         iOS 디바이스 배터리 히스토리 조회
         
         Args:
             device_id: 특정 디바이스 ID (None이면 모든 디바이스)
             days: 조회할 일수
-            
+            columns: 조회할 컬럼 목록 (None이면 전체 컬럼)
+        
         Returns:
             List[Dict]: 히스토리 데이터 리스트
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
+            with self._lock:
+                conn = self._conn
                 cursor = conn.cursor()
-                
-                cutoff_date = datetime.now() - timedelta(days=days)
-                
-                if device_id:
-                    cursor.execute('''
-                        SELECT * FROM ios_battery_history 
-                        WHERE device_id = ? AND timestamp >= ?
-                        ORDER BY timestamp DESC
-                    ''', (device_id, cutoff_date))
-                else:
-                    cursor.execute('''
-                        SELECT * FROM ios_battery_history 
-                        WHERE timestamp >= ?
-                        ORDER BY timestamp DESC
-                    ''', (cutoff_date,))
-                
+                cursor.execute(*self._history_query('ios_battery_history', days, device_id, columns))
                 return [dict(row) for row in cursor.fetchall()]
-                
+        
         except Exception as e:
             print(f"iOS 히스토리 조회 오류: {e}")
             return []
@@ -311,10 +548,13 @@ class BatteryHistoryManager:
             Dict: 월별 요약 정보
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
+            with self._lock:
+                conn = self._conn
                 cursor = conn.cursor()
                 
+                # 최근 12개월 기준 시각 (바인딩 파라미터로 전달해 문장 캐시 재사용)
+                cutoff_date = _format_timestamp(datetime.now() - timedelta(days=365))
+                
                 # Mac 월별 요약
                 cursor.execute('''
                     SELECT 
@@ -323,10 +563,10 @@ class BatteryHistoryManager:
                         MAX(cycle_count) as max_cycles,
                         COUNT(*) as record_count
                     FROM mac_battery_history 
-                    WHERE timestamp >= date('now', '-12 months')
+                    WHERE timestamp >= ?
                     GROUP BY strftime('%Y-%m', timestamp)
                     ORDER BY month DESC
-                ''')
+                ''', (cutoff_date,))
                 
                 mac_summary = [dict(row) for row in cursor.fetchall()]
                 
@@ -340,10 +580,10 @@ class BatteryHistoryManager:
                         MAX(charge_cycles) as max_cycles,
                         COUNT(*) as record_count
                     FROM ios_battery_history 
-                    WHERE timestamp >= date('now', '-12 months')
+                    WHERE timestamp >= ?
                     GROUP BY device_id, strftime('%Y-%m', timestamp)
                     ORDER BY device_name, month DESC
-                ''')
+                ''', (cutoff_date,))
                 
                 ios_summary = [dict(row) for row in cursor.fetchall()]
                 
@@ -368,11 +608,18 @@ class BatteryHistoryManager:
             backup_filename = f"battery_history_backup_{timestamp}.db"
             backup_path = self.backup_dir / backup_filename
             
-            shutil.copy2(self.db_path, backup_path)
+            # SQLite 온라인 백업 API: WAL 내용까지 일관된 페이지 단위로 복사
+            dest = sqlite3.connect(backup_path)
+            try:
+                with self._lock:
+                    self._conn.backup(dest, pages=1024)
+            finally:
+                dest.close()
             
-            # JSON 형태로도 백업 생성
+            # JSON 형태로도 백업 생성 (백그라운드에서 진행)
             json_backup_path = self.backup_dir / f"battery_history_backup_{timestamp}.json"
-            self._export_to_json(json_backup_path)
+            self._pending_backups = [future for future in self._pending_backups if not future.done()]
+            self._pending_backups.append(self._backup_executor.submit(self._export_to_json, json_backup_path))
             
             return str(backup_path)
             
@@ -397,9 +644,19 @@ class BatteryHistoryManager:
             # 현재 데이터베이스 백업
             current_backup = self.create_backup()
             print(f"현재 데이터베이스를 {current_backup}에 백업했습니다.")
+            # 복원 전 데이터로 JSON 내보내기가 끝날 때까지 대기
+            self.wait_for_pending_backups()
             
-            # 백업에서 복원
-            shutil.copy2(backup_path, self.db_path)
+            # 백업에서 복원 (열린 WAL 연결 위로 파일을 덮어쓰지 않도록 SQLite 백업 API 사용)
+            with self._lock:
+                source = sqlite3.connect(backup_path)
+                try:
+                    source.backup(self._conn)
+                finally:
+                    source.close()
+                # 이전 스키마 백업 마이그레이션 및 대리 키 캐시 초기화
+                self._ios_device_keys.clear()
+                self._init_database()
             
             return True
             
@@ -407,25 +664,68 @@ class BatteryHistoryManager:
             print(f"백업 복원 오류: {e}")
             return False
     
+    def wait_for_pending_backups(self, timeout: Optional[float] = None) -> bool:
+        """
+        진행 중인 JSON 백업 내보내기 완료 대기
+        
+        Args:
+            timeout: 최대 대기 시간(초), None이면 완료될 때까지 대기
+            
+        Returns:
+            bool: 모든 내보내기 완료 여부
+        """
+        pending = self._pending_backups
+        if not pending:
+            return True
+        _, not_done = wait(pending, timeout=timeout)
+        self._pending_backups = list(not_done)
+        return not not_done
+    
     def _export_to_json(self, json_path: Path):
-        """JSON 형태로 데이터 내보내기"""
+        """JSON 형태로 데이터 내보내기 (행 단위 스트리밍, 메모리 사용량은 배치 크기에 비례)"""
         try:
-            mac_history = self.get_mac_history(days=365)  # 1년치
-            ios_history = self.get_ios_history(days=365)
-            
-            export_data = {
-                'export_date': datetime.now().isoformat(),
-                'version': '1.0',
-                'mac_battery_history': mac_history,
-                'ios_battery_history': ios_history
-            }
-            
-            with open(json_path, 'w', encoding='utf-8') as f:
-                json.dump(export_data, f, indent=2, ensure_ascii=False, default=str)
-                
+            # 전용 읽기 연결 사용: WAL 모드에서 저장 작업과 동시에 읽기 가능
+            conn = self._connect()
+            try:
+                with open(json_path, 'wb') as f:
+                    f.write(b'{\n')
+                    f.write(b'  "export_date": ' + self._dumps_json(datetime.now().isoformat()) + b',\n')
+                    f.write(b'  "version": "1.0",\n')
+                    f.write(b'  "mac_battery_history": ')
+                    self._stream_json_rows(conn, f, 'mac_battery_history')  # 1년치
+                    f.write(b',\n  "ios_battery_history": ')
+                    self._stream_json_rows(conn, f, 'ios_battery_history')
+                    f.write(b'\n}\n')
+            finally:
+                conn.close()
+        
         except Exception as e:
             print(f"JSON 내보내기 오류: {e}")
     
+    def _stream_json_rows(self, conn: sqlite3.Connection, f, table: str, days: int = 365):
+        """테이블 행을 fetchmany로 나누어 읽으며 JSON 배열로 기록"""
+        cursor = conn.cursor()
+        cursor.arraysize = 1000
+        cursor.execute(*self._history_query(table, days))
+        
+        f.write(b'[')
+        first = True
+        while True:
+            rows = cursor.fetchmany()
+            if not rows:
+                break
+            for row in rows:
+                f.write(b'\n    ' if first else b',\n    ')
+                f.write(self._dumps_json(dict(row)))
+                first = False
+        f.write(b']' if first else b'\n  ]')
+    
+    def _dumps_json(self, value) -> bytes:
+        """JSON 직렬화 (orjson 사용 가능 시 orjson, 아니면 표준 json)"""
+        if orjson is not None:
+            return orjson.dumps(value, default=str)
+        return json.dumps(value, ensure_ascii=False, default=str).encode('utf-8')
+    
     def get_device_list(self) -> Dict[str, List[Dict]]:
         """
         히스토리에 기록된 모든 디바이스 목록 조회
@@ -434,13 +734,13 @@ class BatteryHistoryManager:
             Dict: Mac 및 iOS 디바이스 목록
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
+            with self._lock:
+                conn = self._conn
                 cursor = conn.cursor()
                 
                 # Mac 정보
                 cursor.execute('''
-                    SELECT DISTINCT 
+                    SELECT
                         device_name, device_identifier, serial_number,
                         MIN(timestamp) as first_seen,
                         MAX(timestamp) as last_seen,
@@ -454,13 +754,13 @@ class BatteryHistoryManager:
                 
                 # iOS 디바이스 정보
                 cursor.execute('''
-                    SELECT DISTINCT 
+                    SELECT
                         device_id, device_name, device_model, device_serial,
                         MIN(timestamp) as first_seen,
                         MAX(timestamp) as last_seen,
                         COUNT(*) as record_count
                     FROM ios_battery_history 
-                    GROUP BY device_id
+                    GROUP BY device_key
                     ORDER BY last_seen DESC
                 ''')
                 
@@ -475,20 +775,30 @@ class BatteryHistoryManager:
             print(f"디바이스 목록 조회 오류: {e}")
             return {'mac': [], 'ios': []}
     
+    def close(self):
+        """진행 중인 백업 완료 대기, 쿼리 플래너 통계 갱신 (PRAGMA optimize) 후 데이터베이스 연결 종료"""
+        self.wait_for_pending_backups()
+        self._backup_executor.shutdown(wait=True)
+        with self._lock:
+            if self._conn is None:
+                return
+            try:
+                self._conn.execute("PRAGMA optimize")
+            except Exception as e:
+                print(f"데이터베이스 종료 처리 오류: {e}")
+            finally:
+                self._conn.close()
+                self._conn = None
+    
     # 유틸리티 메서드들
     def _safe_int(self, value) -> Optional[int]:
         """안전하게 정수로 변환"""
         try:
             if value is None:
                 return None
-            int_val = int(value)
-            # SQLite INTEGER 범위 확인 (-2^63 ~ 2^63-1)
-            if int_val > 2**63 - 1:
-                # 2의 보수 방식으로 변환 (amperage 등에서 사용)
-                int_val = int_val - 2**64
-            elif int_val < -2**63:
-                int_val = int_val + 2**64
-            return int_val
+            # SQLite INTEGER 범위(-2^63 ~ 2^63-1)로 2의 보수 변환 (amperage 등에서 사용)
+            # 분기 없이 64비트 마스크로 부호 있는 값으로 접기
+            return ((int(value) + _INT64_SIGN) & _UINT64_MASK) - _INT64_SIGN
         except (ValueError, TypeError):
             return None
     
@@ -506,23 +816,24 @@ class BatteryHistoryManager:
         if isinstance(value, bool):
             return value
         if isinstance(value, str):
-            return value.lower() in ('yes', 'true', '1')
+            # 이미 소문자인 경우 lower() 호출 생략
+            return value in _TRUE_STRINGS or value.lower() in _TRUE_STRINGS
         return bool(value)
     
-    def _calculate_health(self, battery_data: Dict) -> Optional[float]:
-        """배터리 건강도 계산"""
-        try:
-            max_cap = self._safe_int(battery_data.get('apple_raw_max_capacity'))
-            design_cap = self._safe_int(battery_data.get('design_capacity'))
-            
-            if max_cap and design_cap:
-                return round((max_cap / design_cap) * 100, 1)
-        except:
-            pass
+    def _calculate_health(self, max_cap: Optional[int], design_cap: Optional[int]) -> Optional[float]:
+        """배터리 건강도 계산 (이미 정수로 변환된 최대/설계 용량 사용)"""
+        if max_cap and design_cap:
+            return round((max_cap / design_cap) * 100, 1)
         return None
     
     def _get_device_identifier(self) -> str:
-        """디바이스 식별자 가져오기"""
+        """디바이스 식별자 가져오기 (프로세스 실행 중 변하지 않으므로 최초 1회만 조회)"""
+        if self._device_identifier is None:
+            self._device_identifier = self._query_device_identifier()
+        return self._device_identifier
+    
+    def _query_device_identifier(self) -> str:
+        """system_profiler로 Model Identifier 조회"""
         try:
             import subprocess
             result = subprocess.run(['system_profiler', 'SPHardwareDataType'], 
@@ -537,7 +848,13 @@ class BatteryHistoryManager:
         return "Unknown"
     
     def _get_os_version(self) -> str:
-        """macOS 버전 가져오기"""
+        """macOS 버전 가져오기 (최초 1회만 조회)"""
+        if self._os_version is None:
+            self._os_version = self._query_os_version()
+        return self._os_version
+    
+    def _query_os_version(self) -> str:
+        """sw_vers로 macOS 버전 조회"""
         try:
             import subprocess
             result = subprocess.run(['sw_vers', '-productVersion'], 
@@ -547,7 +864,6 @@ class BatteryHistoryManager:
             pass
         return "Unknown"
 
-
 # 사용 예제
 if __name__ == "__main__":
     history_manager = BatteryHistoryManager()
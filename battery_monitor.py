@@ -4,69 +4,522 @@ macOS Battery Monitor
 Coconut Battery와 유사한 배터리 정보 모니터링 도구
 """
 
+import os
 import subprocess
 import json
 import re
 import sys
+import plistlib
 import shutil
 import ctypes
-from ctypes import c_int, c_void_p, c_char_p, c_uint32, POINTER, Structure, CFUNCTYPE
+import ctypes.util
+import functools
+from ctypes import (c_bool, c_double, c_int, c_int32, c_int64, c_long, c_ulong, c_void_p, c_char_p,
+                    c_size_t, c_uint32, POINTER, Structure, CFUNCTYPE)
 import time
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+# ioreg 키 → battery_data 키
+_IOREG_FIELDS = {
+    'CurrentCapacity': 'current_capacity',
+    'MaxCapacity': 'max_capacity',
+    'DesignCapacity': 'design_capacity',
+    'CycleCount': 'cycle_count',
+    'Temperature': 'temperature',
+    'Voltage': 'voltage',
+    'Amperage': 'amperage',
+    'TimeRemaining': 'time_remaining',
+    'IsCharging': 'is_charging',
+    'FullyCharged': 'fully_charged',
+    'ExternalConnected': 'external_connected',
+    'AppleRawCurrentCapacity': 'apple_raw_current_capacity',
+    'AppleRawMaxCapacity': 'apple_raw_max_capacity',
+    'NominalChargeCapacity': 'nominal_charge_capacity',
+    'Serial': 'serial',
+    'DeviceName': 'device_name',
+    # LifetimeData에서 더 합리적인 온도 값 추출
+    'AverageTemperature': 'average_temperature',
+    'MaximumTemperature': 'max_temperature',
+    'MinimumTemperature': 'min_temperature',
+    # 배터리 제조 정보
+    'ManufactureDate': 'manufacture_date',
+    'Manufacturer': 'manufacturer',
+    'PackLotCode': 'pack_lot_code',
+    'BatterySerialNumber': 'battery_serial',
+}
+
+# 사용하는 외부 명령 (GUI 앱으로 실행하면 PATH에 Homebrew 경로가 없을 수 있어 추가로 검색)
+_EXECUTABLES = ('system_profiler', 'ioreg', 'idevice_id', 'ideviceinfo', 'idevicediagnostics')
+_EXTRA_BIN_DIRS = ('/usr/sbin', '/opt/homebrew/bin', '/usr/local/bin')
+
+# Mac Epoch (2001-01-01 00:00:00 UTC) - 배터리 제조일 기준 시각
+_MAC_EPOCH = datetime(2001, 1, 1, tzinfo=timezone.utc)
+
+# 충전 상태 코드 (battery_data['charge_state']): 0=배터리 사용, 1=어댑터 연결(충전 안함), 2=충전 완료, 3=충전 중
+_CHARGE_STATE_TEXT = (
+    "🔋 상태: 배터리 사용 중",
+    "🔌 상태: 어댑터 연결됨 (충전 안함)",
+    "✅ 상태: 충전 완료",
+    "⚡ 상태: 충전 중",
+)
+
+# 폴링 사이에 거의 바뀌지 않는 정보의 캐시 유지 시간 (초)
+_HARDWARE_CACHE_TTL = 300
+_IOS_DEVICES_CACHE_TTL = 10
+
+# idevicediagnostics XML 출력의 정수 항목 (<key>이름</key><integer>값</integer>, bytes 패턴)
+_PLIST_INT_RE = {
+    key: re.compile(rf'<key>{key}</key>\s*<integer>(\d+)</integer>'.encode('ascii'))
+    for key in ('CycleCount', 'DesignCapacity', 'FullChargeCapacity', 'NominalChargeCapacity')
+}
+
+# AMDeviceNotificationSubscribe 콜백 메시지 종류
+_ADNCI_MSG_CONNECTED = 1
+_ADNCI_MSG_FINISHED = 5
+
+# CoreFoundation 상수
+_CF_STRING_ENCODING_UTF8 = 0x08000100
+_CF_NUMBER_SINT64_TYPE = 4
+_CF_NUMBER_FLOAT64_TYPE = 6
+
+# lockdownd 키 → iOS device_info 키
+_IOS_DEVICE_FIELDS = {
+    'DeviceName': 'name',
+    'ProductType': 'model',
+    'ProductVersion': 'ios_version',
+    'SerialNumber': 'serial',
+    'DeviceClass': 'device_class',
+}
+_IOS_BATTERY_FIELDS = {
+    'BatteryCurrentCapacity': 'battery_capacity',
+    'BatteryIsCharging': 'battery_charging',
+    'ExternalChargeCapable': 'external_charge_capable',
+    'ExternalConnected': 'external_connected',
+    'FullyCharged': 'fully_charged',
+    'GasGaugeCapability': 'gas_gauge_capability',
+    'HasBattery': 'has_battery',
+}
+
+
+def _ideviceinfo_pattern(fields):
+    """ideviceinfo 텍스트 출력("Key: value" 줄)에서 지정한 키만 찾는 bytes 패턴 생성"""
+    keys = b'|'.join(key.encode('ascii') for key in fields)
+    return re.compile(rb'^[ \t]*(' + keys + rb'):[ \t]*(.*?)[ \t\r]*$', re.MULTILINE)
+
+
+_IDEVICEINFO_DEVICE_RE = _ideviceinfo_pattern(_IOS_DEVICE_FIELDS)
+_IDEVICEINFO_BATTERY_RE = _ideviceinfo_pattern(_IOS_BATTERY_FIELDS)
+
+
+# 새로고침마다 원시 값이 거의 같으므로 입력값 기준으로 결과를 메모이즈하는 순수 함수
+@functools.lru_cache(maxsize=8)
+def _health_percentage(current_max_raw, design_raw):
+    """최대 용량/설계 용량 원시 값으로 건강도(%) 계산"""
+    return round((int(current_max_raw) / int(design_raw)) * 100, 1)
+
+
+@functools.lru_cache(maxsize=8)
+def _time_remaining_text(time_raw):
+    """남은 시간 원시 값(분)을 시:분 문자열로 변환"""
+    if time_raw and int(time_raw) != 65535:  # 65535는 무한대 표시
+        hours, mins = divmod(int(time_raw), 60)
+        return f"{hours}:{mins:02d}"
+    return "Calculating..."
+
+
+def _find_dylib(name, filename):
+    """동적 라이브러리 로드 (find_library → Homebrew 경로 순, 실패 시 None)"""
+    candidates = [ctypes.util.find_library(name), filename,
+                  f'/opt/homebrew/lib/{filename}', f'/usr/local/lib/{filename}']
+    for path in candidates:
+        if not path:
+            continue
+        try:
+            return ctypes.CDLL(path)
+        except OSError:
+            continue
+    return None
+
+
+@functools.lru_cache(maxsize=None)
+def _load_core_foundation():
+    """CoreFoundation을 한 번만 로드하고 값 변환에 쓰는 함수 시그니처 설정 (없으면 None)"""
+    try:
+        cf = ctypes.CDLL('/System/Library/Frameworks/CoreFoundation.framework/CoreFoundation')
+    except OSError:
+        return None
+    
+    cf.CFGetTypeID.argtypes = [c_void_p]
+    cf.CFGetTypeID.restype = c_ulong
+    for name in ('CFStringGetTypeID', 'CFNumberGetTypeID', 'CFBooleanGetTypeID'):
+        getattr(cf, name).argtypes = []
+        getattr(cf, name).restype = c_ulong
+    cf.CFStringCreateWithCString.argtypes = [c_void_p, c_char_p, c_uint32]
+    cf.CFStringCreateWithCString.restype = c_void_p
+    cf.CFStringGetCStringPtr.argtypes = [c_void_p, c_uint32]
+    cf.CFStringGetCStringPtr.restype = c_char_p
+    cf.CFStringGetLength.argtypes = [c_void_p]
+    cf.CFStringGetLength.restype = c_long
+    cf.CFStringGetMaximumSizeForEncoding.argtypes = [c_long, c_uint32]
+    cf.CFStringGetMaximumSizeForEncoding.restype = c_long
+    cf.CFStringGetCString.argtypes = [c_void_p, c_char_p, c_long, c_uint32]
+    cf.CFStringGetCString.restype = c_bool
+    cf.CFNumberIsFloatType.argtypes = [c_void_p]
+    cf.CFNumberIsFloatType.restype = c_bool
+    cf.CFNumberGetValue.argtypes = [c_void_p, c_long, c_void_p]
+    cf.CFNumberGetValue.restype = c_bool
+    cf.CFBooleanGetValue.argtypes = [c_void_p]
+    cf.CFBooleanGetValue.restype = c_bool
+    cf.CFRelease.argtypes = [c_void_p]
+    cf.CFRelease.restype = None
+    cf.CFArrayGetCount.argtypes = [c_void_p]
+    cf.CFArrayGetCount.restype = c_long
+    cf.CFArrayGetValueAtIndex.argtypes = [c_void_p, c_long]
+    cf.CFArrayGetValueAtIndex.restype = c_void_p
+    cf.CFDictionaryGetValue.argtypes = [c_void_p, c_void_p]
+    cf.CFDictionaryGetValue.restype = c_void_p
+    cf.CFRunLoopGetCurrent.argtypes = []
+    cf.CFRunLoopGetCurrent.restype = c_void_p
+    cf.CFRunLoopStop.argtypes = [c_void_p]
+    cf.CFRunLoopStop.restype = None
+    cf.CFRunLoopRunInMode.argtypes = [c_void_p, c_double, c_bool]
+    cf.CFRunLoopRunInMode.restype = c_int32
+    return cf
+
+
+@functools.lru_cache(maxsize=None)
+def _load_libc():
+    """sysctlbyname이 있는 libc 로드 (macOS 이외에서는 None)"""
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c'))
+        libc.sysctlbyname.argtypes = [c_char_p, c_void_p, POINTER(c_size_t), c_void_p, c_size_t]
+        libc.sysctlbyname.restype = c_int
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+def _sysctl(name):
+    """sysctlbyname으로 값을 원시 bytes로 읽기 (없는 키이거나 실패 시 None)"""
+    libc = _load_libc()
+    if libc is None:
+        return None
+    size = c_size_t(0)
+    if libc.sysctlbyname(name.encode(), None, ctypes.byref(size), None, 0) != 0:
+        return None
+    buffer = ctypes.create_string_buffer(size.value)
+    if libc.sysctlbyname(name.encode(), buffer, ctypes.byref(size), None, 0) != 0:
+        return None
+    return buffer.raw[:size.value]
+
+
+def _sysctl_str(name):
+    """문자열 sysctl 값 (끝의 NUL 제거)"""
+    raw = _sysctl(name)
+    if raw is None:
+        return None
+    return raw.rstrip(b'\0').decode('utf-8', 'replace')
+
+
+def _sysctl_int(name):
+    """정수 sysctl 값 (네이티브 바이트 순서)"""
+    raw = _sysctl(name)
+    if not raw:
+        return None
+    return int.from_bytes(raw, sys.byteorder)
+
+
+@functools.lru_cache(maxsize=None)
+def _load_iokit():
+    """IOKit을 한 번만 로드하고 IORegistry 조회 함수 시그니처 설정 (없으면 None)"""
+    try:
+        iokit = ctypes.CDLL('/System/Library/Frameworks/IOKit.framework/IOKit')
+        iokit.IOServiceMatching.argtypes = [c_char_p]
+        iokit.IOServiceMatching.restype = c_void_p
+        iokit.IOServiceGetMatchingService.argtypes = [c_uint32, c_void_p]
+        iokit.IOServiceGetMatchingService.restype = c_uint32
+        iokit.IORegistryEntryCreateCFProperty.argtypes = [c_uint32, c_void_p, c_void_p, c_uint32]
+        iokit.IORegistryEntryCreateCFProperty.restype = c_void_p
+        iokit.IOObjectRelease.argtypes = [c_uint32]
+        iokit.IOObjectRelease.restype = c_int
+        iokit.IOPSCopyPowerSourcesInfo.argtypes = []
+        iokit.IOPSCopyPowerSourcesInfo.restype = c_void_p
+        iokit.IOPSCopyPowerSourcesList.argtypes = [c_void_p]
+        iokit.IOPSCopyPowerSourcesList.restype = c_void_p
+        iokit.IOPSGetPowerSourceDescription.argtypes = [c_void_p, c_void_p]
+        iokit.IOPSGetPowerSourceDescription.restype = c_void_p
+    except (OSError, AttributeError):
+        return None
+    return iokit
+
+
+# AMDeviceNotificationSubscribe 콜백으로 전달되는 알림 정보 구조체
+class _AMDeviceNotificationCallbackInfo(Structure):
+    _fields_ = [
+        ("device", c_void_p),
+        ("message", c_uint32),
+    ]
+
+
+_AMDeviceNotificationCallback = CFUNCTYPE(None, POINTER(_AMDeviceNotificationCallbackInfo), c_void_p)
+
+
+@functools.lru_cache(maxsize=None)
+def _load_mobile_device():
+    """MobileDevice.framework를 한 번만 로드하고 함수 시그니처 설정 (없으면 None)"""
+    try:
+        lib = ctypes.CDLL("/System/Library/PrivateFrameworks/MobileDevice.framework/MobileDevice")
+        
+        lib.AMDeviceNotificationSubscribe.argtypes = [
+            _AMDeviceNotificationCallback,
+            c_uint32,
+            c_uint32,
+            c_void_p,
+            POINTER(c_void_p)
+        ]
+        lib.AMDeviceNotificationSubscribe.restype = c_int
+        lib.AMDeviceNotificationUnsubscribe.argtypes = [c_void_p]
+        lib.AMDeviceNotificationUnsubscribe.restype = c_int
+        
+        for name in ('AMDeviceConnect', 'AMDeviceStartSession', 'AMDeviceStopSession', 'AMDeviceDisconnect'):
+            getattr(lib, name).argtypes = [c_void_p]
+            getattr(lib, name).restype = c_int
+        lib.AMDeviceCopyValue.argtypes = [c_void_p, c_void_p, c_void_p]
+        lib.AMDeviceCopyValue.restype = c_void_p
+    except (OSError, AttributeError):
+        return None
+    return lib
+
+
+@functools.lru_cache(maxsize=None)
+def _load_libimobiledevice():
+    """libimobiledevice/libplist를 한 번만 로드하고 함수 시그니처 설정 (없으면 None)"""
+    imd = _find_dylib('imobiledevice-1.0', 'libimobiledevice-1.0.dylib')
+    plist_lib = _find_dylib('plist-2.0', 'libplist-2.0.dylib')
+    if imd is None or plist_lib is None:
+        return None
+    
+    try:
+        imd.idevice_get_device_list.argtypes = [POINTER(POINTER(c_char_p)), POINTER(c_int)]
+        imd.idevice_get_device_list.restype = c_int
+        imd.idevice_device_list_free.argtypes = [POINTER(c_char_p)]
+        imd.idevice_device_list_free.restype = c_int
+        imd.idevice_new.argtypes = [POINTER(c_void_p), c_char_p]
+        imd.idevice_new.restype = c_int
+        imd.idevice_free.argtypes = [c_void_p]
+        imd.idevice_free.restype = c_int
+        imd.lockdownd_client_new_with_handshake.argtypes = [c_void_p, POINTER(c_void_p), c_char_p]
+        imd.lockdownd_client_new_with_handshake.restype = c_int
+        imd.lockdownd_get_value.argtypes = [c_void_p, c_char_p, c_char_p, POINTER(c_void_p)]
+        imd.lockdownd_get_value.restype = c_int
+        imd.lockdownd_client_free.argtypes = [c_void_p]
+        imd.lockdownd_client_free.restype = c_int
+        
+        plist_lib.plist_to_xml.argtypes = [c_void_p, POINTER(c_void_p), POINTER(c_uint32)]
+        plist_lib.plist_to_xml.restype = None
+        plist_lib.plist_free.argtypes = [c_void_p]
+        plist_lib.plist_free.restype = None
+        # libplist 2.3+는 plist_mem_free, 이전 버전은 plist_to_xml_free
+        xml_free = getattr(plist_lib, 'plist_mem_free', None) or plist_lib.plist_to_xml_free
+        xml_free.argtypes = [c_void_p]
+        xml_free.restype = None
+    except AttributeError:
+        return None
+    
+    return imd, plist_lib, xml_free
 
 class BatteryMonitor:
     def __init__(self):
         self.battery_data = {}
         self.ios_devices = []
+        # (값, 조회 시각) - 반복 수집 시 system_profiler/USB 스캔 생략용
+        self._hw_cache = (None, 0)
+        self._ios_cache = (None, 0)
+        # 마지막으로 수집한 하드웨어 정보 / 정적 정보 수집 여부 (refresh(fast=True)용)
+        self._hw_info = {}
+        self._static_collected = False
+        # 외부 명령 절대 경로 (PATH 검색은 한 번만, 찾지 못하면 None)
+        search_path = os.pathsep.join([os.environ.get('PATH', ''), *_EXTRA_BIN_DIRS])
+        self._bin = {name: shutil.which(name, path=search_path) for name in _EXECUTABLES}
         
+    def _bin_path(self, name):
+        """외부 명령 실행 경로 (찾지 못한 경우 이름 그대로 - 실행 시 기존과 같은 오류 발생)"""
+        # 절대 경로 + close_fds=False이면 subprocess가 fork/exec 대신 posix_spawn을 사용할 수 있음
+        # (파이썬이 연 fd는 기본적으로 상속되지 않으므로 close_fds=False여도 자식에 새지 않음)
+        return self._bin.get(name) or name
+    
     def get_system_profiler_data(self):
-        """system_profiler를 사용하여 배터리 정보 가져오기"""
+        """system_profiler를 사용하여 배터리 정보 가져오기 (XML plist 형식)"""
         try:
-            result = subprocess.run(['system_profiler', 'SPPowerDataType'], 
-                                 capture_output=True, text=True, check=True)
+            result = subprocess.run([self._bin_path('system_profiler'), '-xml', 'SPPowerDataType'], 
+                                 capture_output=True, check=True, close_fds=False)
             return result.stdout
         except subprocess.CalledProcessError as e:
             print(f"Error running system_profiler: {e}")
             return None
     
     def get_ioreg_data(self):
-        """ioreg를 사용하여 더 상세한 배터리 정보 가져오기"""
+        """ioreg를 사용하여 더 상세한 배터리 정보 가져오기 (XML plist 형식)"""
         try:
-            result = subprocess.run(['ioreg', '-rc', 'AppleSmartBattery'], 
-                                 capture_output=True, text=True, check=True)
+            # plistlib이 bytes를 바로 읽으므로 str 디코딩/재인코딩 없이 원본 그대로 반환
+            result = subprocess.run([self._bin_path('ioreg'), '-a', '-r', '-c', 'AppleSmartBattery'], 
+                                 capture_output=True, check=True, close_fds=False)
             return result.stdout
         except subprocess.CalledProcessError as e:
             print(f"Error running ioreg: {e}")
             return None
     
-    def get_power_management_data(self):
-        """pmset을 사용하여 전력 관리 정보 가져오기 (Low Power Mode 등)"""
+    def get_power_source_info(self):
+        """IOKit IOPowerSources API로 전원 상태 가져오기 (Low Power Mode, 어댑터 연결 등)"""
+        iokit = _load_iokit()
+        cf = _load_core_foundation()
+        if iokit is None or cf is None:
+            return {}
+        
+        info = iokit.IOPSCopyPowerSourcesInfo()
+        if not info:
+            return {}
+        
         try:
-            result = subprocess.run(['pmset', '-g', 'batt'], 
-                                 capture_output=True, text=True, check=True)
-            return result.stdout
-        except subprocess.CalledProcessError as e:
-            print(f"Error running pmset: {e}")
-            return None
+            sources = iokit.IOPSCopyPowerSourcesList(info)
+            if not sources:
+                return {}
+            
+            try:
+                ps_info = {'low_power_mode': False}
+                for index in range(cf.CFArrayGetCount(sources)):
+                    # IOPSGetPowerSourceDescription 결과는 info 소유이므로 해제하지 않음
+                    description = iokit.IOPSGetPowerSourceDescription(
+                        info, cf.CFArrayGetValueAtIndex(sources, index))
+                    if not description:
+                        continue
+                    if self._cf_dict_get(description, b'Type') != 'InternalBattery':
+                        continue
+                    
+                    # 어댑터 연결 상태 ("AC Power" / "Battery Power")
+                    state = self._cf_dict_get(description, b'Power Source State')
+                    if state == 'AC Power':
+                        ps_info['power_adapter_connected'] = True
+                    elif state == 'Battery Power':
+                        ps_info['power_adapter_connected'] = False
+                    
+                    # Low Power Mode 상태
+                    if self._cf_dict_get(description, b'LPM Active'):
+                        ps_info['low_power_mode'] = True
+                    break
+                
+                return ps_info
+            finally:
+                cf.CFRelease(sources)
+        finally:
+            cf.CFRelease(info)
     
     def get_hardware_info(self):
-        """시스템 하드웨어 정보 가져오기"""
+        """시스템 하드웨어 정보 가져오기 (sysctl 결과 dict 또는 XML plist, 5분간 캐시)"""
+        cached, fetched_at = self._hw_cache
+        now = time.monotonic()
+        if cached is not None and now - fetched_at < _HARDWARE_CACHE_TTL:
+            return cached
+        
+        data = self._query_hardware_info()
+        if data is not None:
+            self._hw_cache = (data, now)
+        return data
+    
+    def _query_hardware_info(self):
+        """sysctl/IOKit으로 하드웨어 정보 조회 (사용할 수 없으면 system_profiler)"""
+        hw_info = self._read_hardware_sysctl()
+        if hw_info:
+            return hw_info
+        
         try:
-            result = subprocess.run(['system_profiler', 'SPHardwareDataType'], 
-                                 capture_output=True, text=True, check=True)
+            result = subprocess.run([self._bin_path('system_profiler'), '-xml', 'SPHardwareDataType'], 
+                                 capture_output=True, check=True, close_fds=False)
             return result.stdout
         except subprocess.CalledProcessError as e:
             print(f"Error running system_profiler for hardware: {e}")
             return None
     
+    def _read_hardware_sysctl(self):
+        """프로세스 생성 없이 sysctl/IOKit에서 하드웨어 정보 읽기 (parse_hardware_info와 같은 키)"""
+        model = _sysctl_str('hw.model')
+        if not model:
+            return None
+        
+        hw_info = {'model_identifier': model}
+        
+        processor = _sysctl_str('machdep.cpu.brand_string')
+        if processor:
+            hw_info['processor'] = processor
+        
+        # Intel Mac에만 있음
+        frequency = _sysctl_int('hw.cpufrequency')
+        if frequency:
+            hw_info['processor_speed'] = f"{frequency / 1e9:.1f} GHz"
+        
+        packages = _sysctl_int('hw.packages')
+        if packages:
+            hw_info['number_of_processors'] = str(packages)
+        
+        cores = _sysctl_int('hw.physicalcpu')
+        if cores:
+            hw_info['total_cores'] = str(cores)
+        
+        memory = _sysctl_int('hw.memsize')
+        if memory:
+            hw_info['memory'] = f"{memory // (1024 ** 3)} GB"
+        
+        hw_info.update(self._read_platform_properties())
+        return hw_info
+    
+    def _read_platform_properties(self):
+        """IOPlatformExpertDevice에서 Mac 시리얼 번호와 하드웨어 UUID 읽기"""
+        iokit = _load_iokit()
+        cf = _load_core_foundation()
+        if iokit is None or cf is None:
+            return {}
+        
+        # IOServiceGetMatchingService가 matching 딕셔너리 참조를 가져감
+        service = iokit.IOServiceGetMatchingService(0, iokit.IOServiceMatching(b'IOPlatformExpertDevice'))
+        if not service:
+            return {}
+        
+        properties = {}
+        try:
+            for key, field in ((b'IOPlatformSerialNumber', 'serial'), (b'IOPlatformUUID', 'hardware_uuid')):
+                key_ref = cf.CFStringCreateWithCString(None, key, _CF_STRING_ENCODING_UTF8)
+                value_ptr = iokit.IORegistryEntryCreateCFProperty(service, key_ref, None, 0)
+                cf.CFRelease(key_ref)
+                value = self._parse_cf_value(value_ptr)
+                if value is not None:
+                    properties[field] = value
+        finally:
+            iokit.IOObjectRelease(service)
+        
+        return properties
+    
     def check_ios_devices(self):
-        """연결된 iOS 디바이스 확인"""
+        """연결된 iOS 디바이스 확인 (10초간 캐시)"""
+        cached, fetched_at = self._ios_cache
+        now = time.monotonic()
+        if cached is not None and now - fetched_at < _IOS_DEVICES_CACHE_TTL:
+            return list(cached)
+        
+        devices = self._query_ios_devices() or []
+        for device in devices:
+            self._normalize_ios_device(device)
+        self._ios_cache = (devices, now)
+        return list(devices)
+    
+    def _query_ios_devices(self):
+        """libimobiledevice 또는 system_profiler로 iOS 디바이스 조회"""
         try:
             # GUI에서 사용할 때는 MobileDevice.framework 호출을 건너뛰고
             # 더 안전한 방법들만 사용
             
-            # 1. libimobiledevice 사용 (가장 안전)
-            if shutil.which('ideviceinfo'):
+            # 1. libimobiledevice 사용 (가장 안전, dylib이 있으면 프로세스 내 호출)
+            if _load_libimobiledevice() is not None or self._bin['ideviceinfo']:
                 try:
                     devices = self._get_ios_devices_libimobiledevice()
                     if devices:
@@ -96,9 +549,7 @@ class BatteryMonitor:
         devices = []
         try:
             # 연결된 디바이스 ID 목록 가져오기
-            result = subprocess.run(['idevice_id', '-l'], 
-                                 capture_output=True, text=True, check=True)
-            device_ids = result.stdout.strip().split('\n')
+            device_ids = self._list_ios_device_ids()
             
             for device_id in device_ids:
                 if device_id.strip():
@@ -111,204 +562,267 @@ class BatteryMonitor:
         
         return devices
     
+    def _list_ios_device_ids(self):
+        """연결된 iOS 디바이스 UDID 목록 (dylib이 없으면 idevice_id -l 사용)"""
+        libs = _load_libimobiledevice()
+        if libs is None:
+            result = subprocess.run([self._bin_path('idevice_id'), '-l'], 
+                                 capture_output=True, check=True, close_fds=False)
+            return result.stdout.decode('ascii', 'replace').strip().split('\n')
+        
+        imd = libs[0]
+        device_list = POINTER(c_char_p)()
+        count = c_int()
+        if imd.idevice_get_device_list(ctypes.byref(device_list), ctypes.byref(count)) != 0:
+            return []
+        try:
+            return [device_list[i].decode() for i in range(count.value)]
+        finally:
+            imd.idevice_device_list_free(device_list)
+    
     def _get_ios_device_info(self, device_id):
         """특정 iOS 디바이스의 배터리 정보 가져오기"""
         device_info = {'device_id': device_id, 'connection': 'USB'}
         
-        try:
-            # 기본 디바이스 정보
-            result = subprocess.run(['ideviceinfo', '-u', device_id], 
-                                 capture_output=True, text=True, check=True)
-            
-            info_lines = result.stdout.split('\n')
-            for line in info_lines:
-                if ':' in line:
-                    key, value = line.split(':', 1)
-                    key = key.strip()
-                    value = value.strip()
-                    
-                    if key == 'DeviceName':
-                        device_info['name'] = value
-                    elif key == 'ProductType':
-                        device_info['model'] = value
-                    elif key == 'ProductVersion':
-                        device_info['ios_version'] = value
-                    elif key == 'SerialNumber':
-                        device_info['serial'] = value
-                    elif key == 'DeviceClass':
-                        device_info['device_class'] = value
-            
-            # 배터리 정보 가져오기 시도 (ideviceinfo -q 사용)
+        libs = _load_libimobiledevice()
+        if libs is not None:
+            # 프로세스 내에서 lockdownd 값을 plist로 직접 조회 (ideviceinfo 실행 없음)
+            values = self._read_lockdown_values(libs, device_id)
+            if values is None:
+                return None
+            self._apply_lockdown_values(device_info, *values)
+        else:
             try:
-                battery_result = subprocess.run(['ideviceinfo', '-u', device_id, '-q', 'com.apple.mobile.battery'], 
-                                              capture_output=True, text=True, check=True)
-                
-                battery_lines = battery_result.stdout.split('\n')
-                for line in battery_lines:
-                    if ':' in line:
-                        key, value = line.split(':', 1)
-                        key = key.strip()
-                        value = value.strip()
-                        
-                        if key == 'BatteryCurrentCapacity':
-                            device_info['battery_capacity'] = value
-                            device_info['method'] = 'libimobiledevice'
-                        elif key == 'BatteryIsCharging':
-                            device_info['battery_charging'] = value
-                        elif key == 'ExternalChargeCapable':
-                            device_info['external_charge_capable'] = value
-                        elif key == 'ExternalConnected':
-                            device_info['external_connected'] = value
-                        elif key == 'FullyCharged':
-                            device_info['fully_charged'] = value
-                        elif key == 'GasGaugeCapability':
-                            device_info['gas_gauge_capability'] = value
-                        elif key == 'HasBattery':
-                            device_info['has_battery'] = value
+                self._get_ios_device_info_cli(device_id, device_info)
             except subprocess.CalledProcessError:
-                # 배터리 정보 가져오기 실패 시 기본값 설정
-                device_info['battery_capacity'] = 'Unknown'
-                device_info['battery_charging'] = 'Unknown'
-            
-            # 추가로 ideviceinfo -k로 더 많은 정보 시도
-            battery_keys = [
-                'BatteryCurrentCapacity',
-                'BatteryIsCharging', 
-                'ExternalConnected',
-                'FullyCharged',
-                'HasBattery',
-                'GasGaugeCapability',
-                # 배터리 건강도 관련 정보
-                'BatteryHealthManagement',
-                'BatteryHealthMetrics',
-                'BatteryData',
-                'CycleCount',
-                'DesignCapacity',
-                'NominalChargeCapacity',
-                'MaximumCapacityPercent',
-                'BatteryTemperature'
-            ]
-            
-            for key in battery_keys:
-                try:
-                    key_result = subprocess.run(['ideviceinfo', '-u', device_id, '-k', key], 
-                                              capture_output=True, text=True, check=True)
-                    if key_result.stdout.strip():
-                        value = key_result.stdout.strip()
-                        if key == 'BatteryCurrentCapacity':
-                            device_info['battery_capacity'] = value
-                            device_info['method'] = 'libimobiledevice'
-                        elif key == 'BatteryIsCharging':
-                            device_info['battery_charging'] = value
-                        elif key == 'ExternalConnected':
-                            device_info['external_connected'] = value
-                        elif key == 'FullyCharged':
-                            device_info['fully_charged'] = value
-                        elif key == 'HasBattery':
-                            device_info['has_battery'] = value
-                        elif key == 'GasGaugeCapability':
-                            device_info['gas_gauge_capability'] = value
-                except subprocess.CalledProcessError:
-                    continue
-            
-            # idevicediagnostics를 사용하여 추가 배터리 정보 수집 시도
-            if shutil.which('idevicediagnostics'):
-                try:
-                    # diagnostics 명령으로 배터리 정보 수집 (XML 형식)
-                    diag_result = subprocess.run(['idevicediagnostics', '-u', device_id, 'diagnostics'], 
-                                                capture_output=True, text=True, check=True)
-                    
-                    if diag_result.stdout:
-                        diag_output = diag_result.stdout
-                        
-                        # XML에서 GasGauge 섹션 찾기
-                        if 'GasGauge' in diag_output:
-                            # CycleCount 추출
-                            cycle_match = re.search(r'<key>CycleCount</key>\s*<integer>(\d+)</integer>', diag_output)
-                            if cycle_match:
-                                device_info['cycle_count'] = cycle_match.group(1)
-                                device_info['method'] = 'idevicediagnostics'
-                            
-                            # DesignCapacity 추출
-                            design_match = re.search(r'<key>DesignCapacity</key>\s*<integer>(\d+)</integer>', diag_output)
-                            if design_match:
-                                device_info['design_capacity'] = design_match.group(1)
-                            
-                            # FullChargeCapacity 추출 (현재 배터리 충전량 %)
-                            full_charge_match = re.search(r'<key>FullChargeCapacity</key>\s*<integer>(\d+)</integer>', diag_output)
-                            if full_charge_match:
-                                full_charge_capacity = int(full_charge_match.group(1))
-                                # FullChargeCapacity는 현재 배터리 용량(%)
-                                if device_info.get('battery_capacity') == 'Unknown':
-                                    device_info['battery_capacity'] = str(full_charge_capacity)
+                return None
+        
+        # idevicediagnostics를 사용하여 추가 배터리 정보 수집 시도
+        if self._bin['idevicediagnostics']:
+            try:
+                # diagnostics 명령으로 배터리 정보 수집 (XML 형식)
+                diag_result = subprocess.run([self._bin_path('idevicediagnostics'), '-u', device_id, 'diagnostics'], 
+                                            capture_output=True, check=True, close_fds=False)
                 
-                    # AppleSmartBattery IORegistry에서 정확한 배터리 건강도 정보 가져오기
-                    ioreg_result = subprocess.run(['idevicediagnostics', '-u', device_id, 'ioregentry', 'AppleSmartBattery'], 
-                                                 capture_output=True, text=True, check=True)
+                if diag_result.stdout:
+                    diag_output = diag_result.stdout
                     
-                    if ioreg_result.stdout:
-                        ioreg_output = ioreg_result.stdout
-                        
-                        # NominalChargeCapacity 추출 (실제 최대 용량 mAh)
-                        nominal_match = re.search(r'<key>NominalChargeCapacity</key>\s*<integer>(\d+)</integer>', ioreg_output)
+                    # XML에서 GasGauge 섹션 찾기
+                    if b'GasGauge' in diag_output:
+                        # CycleCount 추출
+                        cycle_match = _PLIST_INT_RE['CycleCount'].search(diag_output)
+                        if cycle_match:
+                            device_info['cycle_count'] = cycle_match.group(1).decode('ascii')
+                            device_info['method'] = 'idevicediagnostics'
                         
                         # DesignCapacity 추출
-                        ioreg_design_match = re.search(r'<key>DesignCapacity</key>\s*<integer>(\d+)</integer>', ioreg_output)
+                        design_match = _PLIST_INT_RE['DesignCapacity'].search(diag_output)
+                        if design_match:
+                            device_info['design_capacity'] = design_match.group(1).decode('ascii')
                         
-                        # CycleCount 추출 (IORegistry에서도 가져올 수 있음)
-                        ioreg_cycle_match = re.search(r'<key>CycleCount</key>\s*<integer>(\d+)</integer>', ioreg_output)
+                        # FullChargeCapacity 추출 (현재 배터리 충전량 %)
+                        full_charge_match = _PLIST_INT_RE['FullChargeCapacity'].search(diag_output)
+                        if full_charge_match:
+                            full_charge_capacity = int(full_charge_match.group(1))
+                            # FullChargeCapacity는 현재 배터리 용량(%)
+                            if device_info.get('battery_capacity') == 'Unknown':
+                                device_info['battery_capacity'] = str(full_charge_capacity)
+            
+                # AppleSmartBattery IORegistry에서 정확한 배터리 건강도 정보 가져오기
+                ioreg_result = subprocess.run([self._bin_path('idevicediagnostics'), '-u', device_id, 'ioregentry', 'AppleSmartBattery'], 
+                                             capture_output=True, check=True, close_fds=False)
+                
+                if ioreg_result.stdout:
+                    ioreg_output = ioreg_result.stdout
+                    
+                    # NominalChargeCapacity 추출 (실제 최대 용량 mAh)
+                    nominal_match = _PLIST_INT_RE['NominalChargeCapacity'].search(ioreg_output)
+                    
+                    # DesignCapacity 추출
+                    ioreg_design_match = _PLIST_INT_RE['DesignCapacity'].search(ioreg_output)
+                    
+                    # CycleCount 추출 (IORegistry에서도 가져올 수 있음)
+                    ioreg_cycle_match = _PLIST_INT_RE['CycleCount'].search(ioreg_output)
+                    
+                    if nominal_match and ioreg_design_match:
+                        nominal_capacity = int(nominal_match.group(1))
+                        design_capacity = int(ioreg_design_match.group(1))
                         
-                        if nominal_match and ioreg_design_match:
-                            nominal_capacity = int(nominal_match.group(1))
-                            design_capacity = int(ioreg_design_match.group(1))
-                            
-                            # 정확한 배터리 건강도 계산: NominalChargeCapacity / DesignCapacity * 100
-                            health_percentage = round((nominal_capacity / design_capacity) * 100, 1)
-                            
-                            device_info['battery_health'] = str(health_percentage)
-                            device_info['nominal_charge_capacity'] = str(nominal_capacity)
-                            device_info['health_calculation_method'] = 'ioreg_nominal_capacity'
-                            
-                            # DesignCapacity 업데이트 (더 정확한 값으로)
-                            device_info['design_capacity'] = str(design_capacity)
+                        # 정확한 배터리 건강도 계산: NominalChargeCapacity / DesignCapacity * 100
+                        health_percentage = round((nominal_capacity / design_capacity) * 100, 1)
                         
-                        # CycleCount 업데이트 (IORegistry에서 가져온 값이 있다면)
-                        if ioreg_cycle_match:
-                            device_info['cycle_count'] = ioreg_cycle_match.group(1)
-                                
-                except subprocess.CalledProcessError:
-                    pass
+                        device_info['battery_health'] = str(health_percentage)
+                        device_info['nominal_charge_capacity'] = str(nominal_capacity)
+                        device_info['health_calculation_method'] = 'ioreg_nominal_capacity'
                         
+                        # DesignCapacity 업데이트 (더 정확한 값으로)
+                        device_info['design_capacity'] = str(design_capacity)
+                    
+                    # CycleCount 업데이트 (IORegistry에서 가져온 값이 있다면)
+                    if ioreg_cycle_match:
+                        device_info['cycle_count'] = ioreg_cycle_match.group(1).decode('ascii')
+                            
+            except subprocess.CalledProcessError:
+                pass
+        
+        return device_info
+    
+    def _get_ios_device_info_cli(self, device_id, device_info):
+        """ideviceinfo 명령 출력에서 디바이스/배터리 정보 수집 (dylib을 못 찾은 경우)"""
+        # 기본 디바이스 정보
+        result = subprocess.run([self._bin_path('ideviceinfo'), '-u', device_id], 
+                             capture_output=True, check=True, close_fds=False)
+        
+        # 필요한 키의 줄만 한 번에 찾음 (전체 줄 분리/split 없이)
+        for key, value in _IDEVICEINFO_DEVICE_RE.findall(result.stdout):
+            device_info[_IOS_DEVICE_FIELDS[key.decode('ascii')]] = value.decode('utf-8', 'replace')
+        
+        # 배터리 정보 가져오기 시도 (ideviceinfo -q 사용)
+        try:
+            battery_result = subprocess.run([self._bin_path('ideviceinfo'), '-u', device_id, '-q', 'com.apple.mobile.battery'], 
+                                          capture_output=True, check=True, close_fds=False)
+            
+            for key, value in _IDEVICEINFO_BATTERY_RE.findall(battery_result.stdout):
+                key = key.decode('ascii')
+                device_info[_IOS_BATTERY_FIELDS[key]] = value.decode('utf-8', 'replace')
+                if key == 'BatteryCurrentCapacity':
+                    device_info['method'] = 'libimobiledevice'
         except subprocess.CalledProcessError:
+            # 배터리 정보 가져오기 실패 시 기본값 설정
+            device_info['battery_capacity'] = 'Unknown'
+            device_info['battery_charging'] = 'Unknown'
+        
+        # 추가로 ideviceinfo -k로 더 많은 정보 시도
+        battery_keys = [
+            'BatteryCurrentCapacity',
+            'BatteryIsCharging', 
+            'ExternalConnected',
+            'FullyCharged',
+            'HasBattery',
+            'GasGaugeCapability',
+            # 배터리 건강도 관련 정보
+            'BatteryHealthManagement',
+            'BatteryHealthMetrics',
+            'BatteryData',
+            'CycleCount',
+            'DesignCapacity',
+            'NominalChargeCapacity',
+            'MaximumCapacityPercent',
+            'BatteryTemperature'
+        ]
+        
+        for key in battery_keys:
+            try:
+                key_result = subprocess.run([self._bin_path('ideviceinfo'), '-u', device_id, '-k', key], 
+                                          capture_output=True, check=True, close_fds=False)
+                value = key_result.stdout.decode('utf-8', 'replace').strip()
+                if value:
+                    if key == 'BatteryCurrentCapacity':
+                        device_info['battery_capacity'] = value
+                        device_info['method'] = 'libimobiledevice'
+                    elif key == 'BatteryIsCharging':
+                        device_info['battery_charging'] = value
+                    elif key == 'ExternalConnected':
+                        device_info['external_connected'] = value
+                    elif key == 'FullyCharged':
+                        device_info['fully_charged'] = value
+                    elif key == 'HasBattery':
+                        device_info['has_battery'] = value
+                    elif key == 'GasGaugeCapability':
+                        device_info['gas_gauge_capability'] = value
+            except subprocess.CalledProcessError:
+                continue
+    
+    def _read_lockdown_values(self, libs, device_id):
+        """lockdownd에서 기본 도메인과 배터리 도메인 값을 dict로 읽기 (실패 시 None)"""
+        imd = libs[0]
+        device = c_void_p()
+        if imd.idevice_new(ctypes.byref(device), device_id.encode()) != 0:
+            return None
+        try:
+            client = c_void_p()
+            if imd.lockdownd_client_new_with_handshake(device, ctypes.byref(client), b'battery-monitor') != 0:
+                return None
+            try:
+                general = self._lockdown_get_dict(libs, client, None)
+                if general is None:
+                    return None
+                battery = self._lockdown_get_dict(libs, client, b'com.apple.mobile.battery') or {}
+                return general, battery
+            finally:
+                imd.lockdownd_client_free(client)
+        finally:
+            imd.idevice_free(device)
+    
+    def _lockdown_get_dict(self, libs, client, domain):
+        """lockdownd_get_value 결과(plist_t)를 XML로 변환해 plistlib으로 읽기"""
+        imd, plist_lib, xml_free = libs
+        node = c_void_p()
+        if imd.lockdownd_get_value(client, domain, None, ctypes.byref(node)) != 0 or not node:
             return None
+        try:
+            xml = c_void_p()
+            length = c_uint32()
+            plist_lib.plist_to_xml(node, ctypes.byref(xml), ctypes.byref(length))
+            if not xml:
+                return None
+            try:
+                return plistlib.loads(ctypes.string_at(xml, length.value))
+            finally:
+                xml_free(xml)
+        finally:
+            plist_lib.plist_free(node)
+    
+    def _apply_lockdown_values(self, device_info, general, battery):
+        """lockdownd 값을 ideviceinfo 텍스트 파싱과 같은 키/문자열 형식으로 device_info에 반영"""
+        for key, field in _IOS_DEVICE_FIELDS.items():
+            if key in general:
+                device_info[field] = self._lockdown_str(general[key])
         
-        return device_info
+        # 배터리 도메인 → 기본 도메인 순 (기존 -q 조회 후 -k 조회와 같은 우선순위)
+        if not battery:
+            device_info['battery_capacity'] = 'Unknown'
+            device_info['battery_charging'] = 'Unknown'
+        for source in (battery, general):
+            for key, field in _IOS_BATTERY_FIELDS.items():
+                if key in source:
+                    device_info[field] = self._lockdown_str(source[key])
+                    if key == 'BatteryCurrentCapacity':
+                        device_info['method'] = 'libimobiledevice'
+    
+    def _lockdown_str(self, value):
+        """plist 값을 ideviceinfo 출력과 같은 문자열로 변환 (불리언은 true/false)"""
+        if isinstance(value, bool):
+            return 'true' if value else 'false'
+        return str(value)
     
     def _get_ios_devices_system_profiler(self):
         """system_profiler를 사용하여 연결된 iOS 디바이스 확인"""
         devices = []
         try:
-            result = subprocess.run(['system_profiler', 'SPUSBDataType'], 
-                                 capture_output=True, text=True, check=True)
-            
-            # iOS 디바이스 패턴 찾기
-            ios_patterns = [
-                r'iPhone',
-                r'iPad',
-                r'iPod',
-            ]
+            result = subprocess.run([self._bin_path('system_profiler'), '-xml', 'SPUSBDataType'], 
+                                 capture_output=True, check=True, close_fds=False)
             
-            for pattern in ios_patterns:
-                matches = re.finditer(pattern, result.stdout, re.IGNORECASE)
-                for match in matches:
+            # USB 트리(_items)를 따라가며 이름이 iPhone/iPad/iPod인 항목만 수집
+            pending = list(self._system_profiler_items(result.stdout))
+            while pending:
+                entry = pending.pop(0)
+                pending[:0] = entry.get('_items', [])
+                
+                name = entry.get('_name', '')
+                # 기존 정규식 검색과 같이 대소문자 구분 없이 비교
+                if name.lower().startswith(('iphone', 'ipad', 'ipod')):
                     # 간단한 디바이스 정보만 수집
                     device_info = {
-                        'name': pattern,
+                        'name': name,
                         'type': 'iOS Device',
                         'connection': 'USB'
                     }
+                    # 시리얼이 없는 항목은 키를 두지 않음 (저장 시 'unknown'으로 대체)
+                    if entry.get('serial_num'):
+                        device_info['serial'] = entry['serial_num']
                     devices.append(device_info)
-                    
+        
         except subprocess.CalledProcessError:
             pass
         
@@ -318,30 +832,21 @@ class BatteryMonitor:
         """매OS MobileDevice.framework를 사용하여 iOS 디바이스 정보 가져오기 (CoconutBattery 방식)"""
         devices = []
         
+        mobile_device_lib = _load_mobile_device()
+        cf_lib = _load_core_foundation()
+        if mobile_device_lib is None or cf_lib is None:
+            # 프레임워크 로드 실패
+            return devices
+        
         try:
-            # MobileDevice.framework 로드 시도
-            framework_path = "/System/Library/PrivateFrameworks/MobileDevice.framework/MobileDevice"
-            mobile_device_lib = ctypes.CDLL(framework_path)
-            
-            # 기본 구조체 정의
-            class AMDeviceNotification(Structure):
-                _fields_ = [
-                    ("unknown0", c_uint32),
-                    ("unknown1", c_uint32),
-                    ("unknown2", c_uint32),
-                    ("callback", c_void_p),
-                    ("unknown3", c_uint32),
-                ]
-            
-            # 콜백 함수 타입
-            AMDeviceNotificationCallback = CFUNCTYPE(None, POINTER(AMDeviceNotification), c_void_p)
-            
             # 전역 디바이스 리스트
             found_devices = []
             
-            def device_callback(notification_ptr, device_ptr):
-                if device_ptr:
+            def device_callback(info_ptr, user_data):
+                info = info_ptr.contents
+                if info.message == _ADNCI_MSG_CONNECTED and info.device:
                     # 디바이스 연결 시도 및 배터리 정보 가져오기
+                    device_ptr = info.device
                     battery_info = self._get_ios_battery_info_from_device(mobile_device_lib, device_ptr)
                     
                     device_info = {
@@ -358,45 +863,35 @@ class BatteryMonitor:
                         'battery_voltage': battery_info.get('BatteryVoltage', 'Unknown'),
                     }
                     found_devices.append(device_info)
+                elif info.message == _ADNCI_MSG_FINISHED:
+                    # 초기 디바이스 목록 전달 완료 → 런루프 즉시 종료
+                    cf_lib.CFRunLoopStop(cf_lib.CFRunLoopGetCurrent())
             
-            # API 함수 설정
-            try:
-                mobile_device_lib.AMDeviceNotificationSubscribe.argtypes = [
-                    AMDeviceNotificationCallback,
-                    c_uint32,
-                    c_uint32,
-                    c_void_p,
-                    POINTER(c_void_p)
-                ]
-                mobile_device_lib.AMDeviceNotificationSubscribe.restype = c_int
-                
-                # 콜백 생성 및 등록
-                callback_func = AMDeviceNotificationCallback(device_callback)
-                notification_ptr = c_void_p()
-                
-                # 디바이스 모니터링 시작
-                result = mobile_device_lib.AMDeviceNotificationSubscribe(
-                    callback_func,
-                    0,
-                    0,
-                    None,
-                    ctypes.byref(notification_ptr)
-                )
-                
-                if result == 0:
-                    # 매우 짧은 대기 시간으로 변경 (GUI 응답성 향상)
-                    time.sleep(0.1)
+            # 콜백 생성 및 등록
+            callback_func = _AMDeviceNotificationCallback(device_callback)
+            notification_ptr = c_void_p()
+            
+            # 디바이스 모니터링 시작
+            result = mobile_device_lib.AMDeviceNotificationSubscribe(
+                callback_func,
+                0,
+                0,
+                None,
+                ctypes.byref(notification_ptr)
+            )
+            
+            if result == 0:
+                try:
+                    # 고정 대기 대신 런루프를 돌리며 초기 목록 완료 알림을 기다림 (최대 2초)
+                    default_mode = c_void_p.in_dll(cf_lib, 'kCFRunLoopDefaultMode')
+                    cf_lib.CFRunLoopRunInMode(default_mode, 2.0, False)
                     devices = found_devices.copy()
-                    
-            except AttributeError:
-                # API 함수를 찾을 수 없는 경우
-                pass
-                
-        except OSError:
-            # 프레임워크 로드 실패
-            pass
-        except Exception:
-            # 기타 오류
+                finally:
+                    # 이후 collect_all_data 호출에 콜백이 남지 않도록 구독 해제
+                    mobile_device_lib.AMDeviceNotificationUnsubscribe(notification_ptr)
+        
+        except (OSError, ValueError, ctypes.ArgumentError):
+            # 심볼을 찾을 수 없거나 호출 인자 변환 실패
             pass
         
         return devices
@@ -405,217 +900,248 @@ class BatteryMonitor:
         """비공개 MobileDevice.framework를 사용하여 iOS 디바이스에서 배터리 정보 추출"""
         battery_info = {}
         
+        cf = _load_core_foundation()
+        if cf is None:
+            return battery_info
+        
+        # 1. 디바이스 연결
+        connect_result = mobile_device_lib.AMDeviceConnect(device_ptr)
+        if connect_result != 0:
+            return battery_info
+        
         try:
-            # API 함수 설정 시도
-            mobile_device_lib.AMDeviceConnect.argtypes = [c_void_p]
-            mobile_device_lib.AMDeviceConnect.restype = c_int
-            
-            mobile_device_lib.AMDeviceStartSession.argtypes = [c_void_p]
-            mobile_device_lib.AMDeviceStartSession.restype = c_int
-            
-            mobile_device_lib.AMDeviceCopyValue.argtypes = [c_void_p, c_void_p, c_char_p]
-            mobile_device_lib.AMDeviceCopyValue.restype = c_void_p
-            
-            mobile_device_lib.AMDeviceStopSession.argtypes = [c_void_p]
-            mobile_device_lib.AMDeviceStopSession.restype = c_int
-            
-            mobile_device_lib.AMDeviceDisconnect.argtypes = [c_void_p]
-            mobile_device_lib.AMDeviceDisconnect.restype = c_int
-            
-            # 1. 디바이스 연결
-            connect_result = mobile_device_lib.AMDeviceConnect(device_ptr)
-            if connect_result != 0:
-                return battery_info
-            
             # 2. 세션 시작
             session_result = mobile_device_lib.AMDeviceStartSession(device_ptr)
             if session_result != 0:
-                mobile_device_lib.AMDeviceDisconnect(device_ptr)
                 return battery_info
             
-            # 3. 배터리 정보 요청
-            battery_keys = [
-                b"BatteryCurrentCapacity",   # 현재 용량 %
-                b"BatteryIsCharging",        # 충전 상태
-                b"BatteryVoltage",           # 전압
-                b"DeviceName",               # 디바이스 이름
-                b"ProductType",              # 모델명  
-                b"ProductVersion",           # iOS 버전
-                b"SerialNumber",             # 시리얼 번호
-            ]
-            
-            for key in battery_keys:
-                try:
+            try:
+                # 3. 배터리 정보 요청
+                battery_keys = [
+                    b"BatteryCurrentCapacity",   # 현재 용량 %
+                    b"BatteryIsCharging",        # 충전 상태
+                    b"BatteryVoltage",           # 전압
+                    b"DeviceName",               # 디바이스 이름
+                    b"ProductType",              # 모델명  
+                    b"ProductVersion",           # iOS 버전
+                    b"SerialNumber",             # 시리얼 번호
+                ]
+                
+                for key in battery_keys:
+                    # AMDeviceCopyValue의 키는 CFString이어야 함
+                    key_ref = cf.CFStringCreateWithCString(None, key, _CF_STRING_ENCODING_UTF8)
                     value_ptr = mobile_device_lib.AMDeviceCopyValue(
                         device_ptr,
                         None,  # domain (None = 기본 도메인)
-                        key
+                        key_ref
                     )
+                    cf.CFRelease(key_ref)
                     
-                    if value_ptr:
-                        # CoreFoundation 객체를 Python 값으로 변환
-                        # 실제 구현에서는 CFStringGetCStringPtr, CFNumberGetValue 등 사용
-                        # 여기서는 일단 포인터 주소만 저장
-                        battery_info[key.decode()] = self._parse_cf_value(value_ptr)
-                        
-                except Exception:
-                    # 개별 키 오류는 무시하고 계속
-                    pass
-            
-            # 4. 세션 종료 및 연결 해제
-            mobile_device_lib.AMDeviceStopSession(device_ptr)
-            mobile_device_lib.AMDeviceDisconnect(device_ptr)
-            
-        except Exception:
-            # 전체 과정에서 오류가 발생하면 마지막에 정리
-            try:
+                    # 잠긴 디바이스 등에서는 NULL이 흔하므로 예외 없이 건너뜀
+                    if not value_ptr:
+                        continue
+                    
+                    # CoreFoundation 객체를 Python 값으로 변환 (기존과 같이 문자열로 저장)
+                    value = self._parse_cf_value(value_ptr)
+                    if value is not None:
+                        battery_info[key.decode()] = str(value)
+            finally:
+                # 4. 세션 종료
                 mobile_device_lib.AMDeviceStopSession(device_ptr)
-                mobile_device_lib.AMDeviceDisconnect(device_ptr)
-            except:
-                pass
+        finally:
+            # 5. 연결 해제
+            mobile_device_lib.AMDeviceDisconnect(device_ptr)
         
         return battery_info
     
     def _parse_cf_value(self, cf_value_ptr):
-        """비공개 CoreFoundation 객체를 Python 값으로 변환 (간단한 구현)"""
-        # 실제로는 CoreFoundation 함수들을 사용해야 하지만
-        # 여기서는 일단 더미 값으로 처리
-        if cf_value_ptr:
-            try:
-                # CoreFoundation 라이브러리 로드 시도
-                cf_lib = ctypes.CDLL('/System/Library/Frameworks/CoreFoundation.framework/CoreFoundation')
-                
-                # CFString인지 CFNumber인지 확인하는 기능 추가 필요
-                # 지금은 일단 포인터 주소만 반환
-                return f"CF_Value_{hex(cf_value_ptr)}"
-            except:
-                return "Unknown"
-        return "None"
+        """CoreFoundation 객체(CFString/CFNumber/CFBoolean)를 Python 값으로 변환 후 해제"""
+        if not cf_value_ptr:
+            return None
+        
+        cf = _load_core_foundation()
+        if cf is None:
+            return None
+        
+        try:
+            return self._convert_cf_value(cf, cf_value_ptr)
+        finally:
+            # Copy/Create 함수가 반환한 객체는 호출자가 해제해야 함
+            cf.CFRelease(cf_value_ptr)
+    
+    def _cf_dict_get(self, dictionary, key):
+        """CFDictionary에서 키(bytes) 값을 Python 값으로 읽기 (딕셔너리 소유 값이므로 해제하지 않음)"""
+        cf = _load_core_foundation()
+        key_ref = cf.CFStringCreateWithCString(None, key, _CF_STRING_ENCODING_UTF8)
+        try:
+            value_ptr = cf.CFDictionaryGetValue(dictionary, key_ref)
+        finally:
+            cf.CFRelease(key_ref)
+        if not value_ptr:
+            return None
+        return self._convert_cf_value(cf, value_ptr)
+    
+    def _convert_cf_value(self, cf, cf_value_ptr):
+        """CFString/CFNumber/CFBoolean 값을 Python 값으로 변환 (그 외 타입은 None)"""
+        type_id = cf.CFGetTypeID(cf_value_ptr)
+        
+        if type_id == cf.CFStringGetTypeID():
+            # 내부 버퍼를 바로 얻을 수 있으면 복사 1회로 끝남
+            value = cf.CFStringGetCStringPtr(cf_value_ptr, _CF_STRING_ENCODING_UTF8)
+            if value is not None:
+                return value.decode('utf-8')
+            length = cf.CFStringGetLength(cf_value_ptr)
+            size = cf.CFStringGetMaximumSizeForEncoding(length, _CF_STRING_ENCODING_UTF8) + 1
+            buffer = ctypes.create_string_buffer(size)
+            if cf.CFStringGetCString(cf_value_ptr, buffer, size, _CF_STRING_ENCODING_UTF8):
+                return buffer.value.decode('utf-8')
+            return None
+        
+        if type_id == cf.CFNumberGetTypeID():
+            if cf.CFNumberIsFloatType(cf_value_ptr):
+                value = c_double()
+                number_type = _CF_NUMBER_FLOAT64_TYPE
+            else:
+                value = c_int64()
+                number_type = _CF_NUMBER_SINT64_TYPE
+            if cf.CFNumberGetValue(cf_value_ptr, number_type, ctypes.byref(value)):
+                return value.value
+            return None
+        
+        if type_id == cf.CFBooleanGetTypeID():
+            return bool(cf.CFBooleanGetValue(cf_value_ptr))
+        
+        return None
     
     def parse_system_profiler(self, data):
-        """system_profiler 출력에서 배터리 정보 파싱"""
+        """system_profiler -xml 출력(plist)에서 배터리 정보 파싱"""
         if not data:
             return {}
         
         battery_info = {}
         
-        # 기본 정보 추출
-        patterns = {
-            'serial_number': r'Serial Number:\s*(\S+)',
-            'device_name': r'Device Name:\s*(\S+)',
-            'firmware_version': r'Firmware Version:\s*(\S+)',
-            'cycle_count': r'Cycle Count:\s*(\d+)',
-            'condition': r'Condition:\s*(\w+)',
-            'max_capacity': r'Maximum Capacity:\s*(\d+)%',
-            'state_of_charge': r'State of Charge \(%\):\s*(\d+)',
-            'fully_charged': r'Fully Charged:\s*(\w+)',
-            'charging': r'Charging:\s*(\w+)',
-        }
-        
-        for key, pattern in patterns.items():
-            match = re.search(pattern, data)
-            if match:
-                battery_info[key] = match.group(1)
+        for item in self._system_profiler_items(data):
+            charge_info = item.get('sppower_battery_charge_info')
+            health_info = item.get('sppower_battery_health_info')
+            model_info = item.get('sppower_battery_model_info')
+            if not (charge_info or health_info or model_info):
+                continue
+            charge_info = charge_info or {}
+            health_info = health_info or {}
+            model_info = model_info or {}
+            
+            # 기본 정보 추출 (텍스트 출력 파싱 시와 같은 키/값 형식 유지)
+            fields = {
+                'serial_number': model_info.get('sppower_battery_serial_number'),
+                'device_name': model_info.get('sppower_battery_device_name'),
+                'firmware_version': model_info.get('sppower_battery_firmware_version'),
+                'cycle_count': health_info.get('sppower_battery_cycle_count'),
+                'condition': health_info.get('sppower_battery_health'),
+                'max_capacity': health_info.get('sppower_battery_health_maximum_capacity'),
+                'state_of_charge': charge_info.get('sppower_battery_state_of_charge'),
+                'fully_charged': charge_info.get('sppower_battery_fully_charged'),
+                'charging': charge_info.get('sppower_battery_is_charging'),
+            }
+            
+            for key, value in fields.items():
+                if value is None:
+                    continue
+                if key in ('fully_charged', 'charging'):
+                    value = self._yes_no(value)
+                elif key == 'max_capacity':
+                    value = str(value).rstrip('%')
+                battery_info[key] = str(value)
+            break
         
         return battery_info
     
+    def _system_profiler_items(self, data):
+        """system_profiler -xml 출력에서 최상위 _items 목록 추출"""
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        plist = plistlib.loads(data)
+        if not plist:
+            return []
+        return plist[0].get('_items', [])
+    
+    def _yes_no(self, value):
+        """plist의 불리언(TRUE/FALSE) 값을 기존 'Yes'/'No' 형식으로 변환"""
+        if isinstance(value, bool):
+            return 'Yes' if value else 'No'
+        return 'Yes' if str(value).strip().upper() in ('TRUE', 'YES') else 'No'
+    
     def parse_ioreg_data(self, data):
-        """ioreg 출력에서 배터리 정보 파싱"""
+        """ioreg -a 출력(plist)에서 배터리 정보 파싱"""
         if not data:
             return {}
         
-        ioreg_info = {}
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        plist = plistlib.loads(data)
+        if not plist:
+            return {}
         
-        # 주요 필드들 추출
-        patterns = {
-            'current_capacity': r'"CurrentCapacity"\s*=\s*(\d+)',
-            'max_capacity': r'"MaxCapacity"\s*=\s*(\d+)', 
-            'design_capacity': r'"DesignCapacity"\s*=\s*(\d+)',
-            'cycle_count': r'"CycleCount"\s*=\s*(\d+)',
-            'temperature': r'"Temperature"\s*=\s*(\d+)',
-            'voltage': r'"Voltage"\s*=\s*(\d+)',
-            'amperage': r'"Amperage"\s*=\s*(\d+)',
-            'time_remaining': r'"TimeRemaining"\s*=\s*(\d+)',
-            'is_charging': r'"IsCharging"\s*=\s*(\w+)',
-            'fully_charged': r'"FullyCharged"\s*=\s*(\w+)',
-            'external_connected': r'"ExternalConnected"\s*=\s*(\w+)',
-            'apple_raw_current_capacity': r'"AppleRawCurrentCapacity"\s*=\s*(\d+)',
-            'apple_raw_max_capacity': r'"AppleRawMaxCapacity"\s*=\s*(\d+)',
-            'nominal_charge_capacity': r'"NominalChargeCapacity"\s*=\s*(\d+)',
-            'serial': r'"Serial"\s*=\s*"([^"]+)"',
-            'device_name': r'"DeviceName"\s*=\s*"([^"]+)"',
-            # LifetimeData에서 더 합리적인 온도 값 추출
-            'average_temperature': r'"AverageTemperature"\s*=\s*(\d+)',
-            'max_temperature': r'"MaximumTemperature"\s*=\s*(\d+)',
-            'min_temperature': r'"MinimumTemperature"\s*=\s*(\d+)',
-            # 배터리 제조 정보
-            'manufacture_date': r'"ManufactureDate"\s*=\s*(\d+)',
-            'manufacturer': r'"Manufacturer"\s*=\s*"([^"]+)"',
-            'pack_lot_code': r'"PackLotCode"\s*=\s*"([^"]+)"',
-            'battery_serial': r'"BatterySerialNumber"\s*=\s*"([^"]+)"',
-        }
+        ioreg_info = {}
         
-        for key, pattern in patterns.items():
-            match = re.search(pattern, data)
-            if match:
-                ioreg_info[key] = match.group(1)
+        # 최상위 키를 먼저 보고, 없으면 LifetimeData 등 하위 딕셔너리에서 찾음
+        # (텍스트 출력에서 처음 나온 값을 사용하던 것과 같은 우선순위)
+        pending = [plist[0]]
+        while pending:
+            nested = []
+            for entry in pending:
+                for ioreg_key, value in entry.items():
+                    if isinstance(value, dict):
+                        nested.append(value)
+                        continue
+                    key = _IOREG_FIELDS.get(ioreg_key)
+                    if key is None or key in ioreg_info:
+                        continue
+                    if isinstance(value, bool):
+                        # GUI/히스토리에서 사용하는 'Yes'/'No' 형식 유지
+                        value = self._yes_no(value)
+                    ioreg_info[key] = value
+            pending = nested
         
         return ioreg_info
     
-    def parse_power_management_data(self, data):
-        """pmset 출력에서 전력 관리 정보 파싱 (Low Power Mode 등)"""
+    def parse_hardware_info(self, data):
+        """하드웨어 정보 파싱 (system_profiler -xml SPHardwareDataType)"""
         if not data:
             return {}
         
-        pm_info = {}
-        
-        # Low Power Mode 감지
-        if 'lowpowermode' in data.lower():
-            # macOS에서 Low Power Mode 상태 확인
-            if re.search(r'lowpowermode\s+1', data, re.IGNORECASE):
-                pm_info['low_power_mode'] = True
-            else:
-                pm_info['low_power_mode'] = False
-        else:
-            pm_info['low_power_mode'] = False
-        
-        # 배터리 상태에서 현재 전력 사용량 추출
-        power_match = re.search(r'(\d+)W', data)
-        if power_match:
-            pm_info['current_power_usage'] = int(power_match.group(1))
+        # sysctl/IOKit에서 읽은 값은 이미 dict 형태
+        if isinstance(data, dict):
+            return dict(data)
         
-        # 어댑터 연결 상태
-        if "AC Power" in data:
-            pm_info['power_adapter_connected'] = True
-        elif "Battery Power" in data:
-            pm_info['power_adapter_connected'] = False
-        
-        return pm_info
-    
-    def parse_hardware_info(self, data):
-        """하드웨어 정보 파싱"""
-        if not data:
+        items = self._system_profiler_items(data)
+        if not items:
             return {}
+        item = items[0]
         
         hw_info = {}
         
-        patterns = {
-            'model_name': r'Model Name:\s*(.+)',
-            'model_identifier': r'Model Identifier:\s*(.+)',
-            'processor': r'Processor Name:\s*(.+)',
-            'processor_speed': r'Processor Speed:\s*(.+)',
-            'number_of_processors': r'Number of Processors:\s*(\d+)',
-            'total_cores': r'Total Number of Cores:\s*(\d+)',
-            'memory': r'Memory:\s*(.+)',
-            'boot_rom': r'Boot ROM Version:\s*(.+)',
-            'serial': r'Serial Number \(system\):\s*(.+)',
-            'hardware_uuid': r'Hardware UUID:\s*(.+)',
+        # 텍스트 출력의 항목명 → plist 키
+        fields = {
+            'model_name': item.get('machine_name'),
+            'model_identifier': item.get('machine_model'),
+            'processor': item.get('cpu_type') or item.get('chip_type'),
+            'processor_speed': item.get('current_processor_speed'),
+            'number_of_processors': item.get('packages'),
+            'total_cores': item.get('number_processors'),
+            'memory': item.get('physical_memory'),
+            'boot_rom': item.get('boot_rom_version'),
+            'serial': item.get('serial_number'),
+            'hardware_uuid': item.get('platform_UUID'),
         }
         
-        for key, pattern in patterns.items():
-            match = re.search(pattern, data)
-            if match:
-                hw_info[key] = match.group(1).strip()
+        for key, value in fields.items():
+            if value is None:
+                continue
+            value = str(value).strip()
+            if key == 'total_cores' and value.startswith('proc '):
+                # Apple Silicon: "proc 10:8:2" (전체:성능:효율 코어)
+                value = value[len('proc '):].split(':')[0]
+            hw_info[key] = value
         
         return hw_info
     
@@ -624,13 +1150,7 @@ class BatteryMonitor:
         if date_raw:
             try:
                 # macOS 배터리 제조일은 보통 Mac Epoch (2001-01-01 기준)에서의 초
-                timestamp = int(date_raw)
-                # Mac Epoch는 2001-01-01 00:00:00 UTC
-                import calendar
-                from datetime import datetime, timezone
-                
-                mac_epoch = datetime(2001, 1, 1, tzinfo=timezone.utc)
-                manufacture_date = mac_epoch + timedelta(seconds=timestamp)
+                manufacture_date = _MAC_EPOCH + timedelta(seconds=int(date_raw))
                 return manufacture_date.strftime('%Y-%m-%d')
             except:
                 return date_raw
@@ -643,7 +1163,6 @@ class BatteryMonitor:
             formatted_date = self.format_manufacture_date(manufacture_date)
             if formatted_date:
                 try:
-                    from datetime import datetime
                     mfg_date = datetime.strptime(formatted_date, '%Y-%m-%d')
                     age = datetime.now() - mfg_date
                     return age.days
@@ -654,10 +1173,8 @@ class BatteryMonitor:
     def calculate_battery_health(self):
         """배터리 건강도 계산"""
         if 'apple_raw_max_capacity' in self.battery_data and 'design_capacity' in self.battery_data:
-            current_max = int(self.battery_data['apple_raw_max_capacity'])
-            design = int(self.battery_data['design_capacity'])
-            health_percentage = round((current_max / design) * 100, 1)
-            return health_percentage
+            return _health_percentage(self.battery_data['apple_raw_max_capacity'],
+                                      self.battery_data['design_capacity'])
         return None
     
     def format_temperature(self, temp_raw):
@@ -694,57 +1211,98 @@ class BatteryMonitor:
     
     def format_time_remaining(self, time_raw):
         """남은 시간 포맷팅 (분 → 시:분)"""
-        if time_raw and int(time_raw) != 65535:  # 65535는 무한대 표시
-            minutes = int(time_raw)
-            hours = minutes // 60
-            mins = minutes % 60
-            return f"{hours}:{mins:02d}"
-        return "Calculating..."
+        return _time_remaining_text(time_raw)
     
     def collect_all_data(self):
         """모든 배터리 데이터 수집"""
+        self._collect(static=True, dynamic=True)
+    
+    def collect_static(self):
+        """자주 바뀌지 않는 정보 수집 (배터리 모델 정보, 하드웨어, iOS 디바이스)"""
+        self._collect(static=True, dynamic=False)
+    
+    def collect_dynamic(self):
+        """매 폴링마다 바뀌는 배터리 상태만 수집 (ioreg, IOPowerSources)"""
+        self._collect(static=False, dynamic=True)
+    
+    def refresh(self, fast=True):
+        """
+        폴링용 갱신
+        
+        fast=True이면 정적 정보는 이전 수집 결과를 그대로 두고 동적 값만 다시 읽음
+        (정적 정보를 한 번도 수집하지 않았다면 전체 수집)
+        """
+        if fast and self._static_collected:
+            self.collect_dynamic()
+        else:
+            self.collect_all_data()
+    
+    def _collect(self, static, dynamic):
+        """선택한 그룹의 데이터를 동시에 수집하고 battery_data에 병합"""
         try:
-            print("배터리 정보를 수집하는 중...")
+            if static:
+                print("배터리 정보를 수집하는 중...")
             
+            # 서로 독립적인 외부 명령들을 동시에 실행 (전체 소요 시간 = 가장 느린 명령 시간)
+            sp_future = ioreg_future = pm_future = hw_future = ios_future = None
+            with ThreadPoolExecutor(max_workers=5) as executor:
+                if static:
+                    sp_future = executor.submit(self.get_system_profiler_data)
+                if dynamic:
+                    ioreg_future = executor.submit(self.get_ioreg_data)
+                    pm_future = executor.submit(self.get_power_source_info)
+                if static:
+                    hw_future = executor.submit(self.get_hardware_info)
+                    ios_future = executor.submit(self.check_ios_devices)
+            
+            # 결과는 기존과 같은 순서로 파싱/병합 (뒤의 값이 앞의 값을 덮어씀)
             # system_profiler 데이터
-            try:
-                sp_data = self.get_system_profiler_data()
-                sp_info = self.parse_system_profiler(sp_data)
-                self.battery_data.update(sp_info)
-            except Exception as e:
-                print(f"Warning: Failed to get system_profiler data: {e}")
+            if sp_future is not None:
+                try:
+                    sp_info = self.parse_system_profiler(sp_future.result())
+                    self.battery_data.update(sp_info)
+                except Exception as e:
+                    print(f"Warning: Failed to get system_profiler data: {e}")
             
             # ioreg 데이터
-            try:
-                ioreg_data = self.get_ioreg_data()
-                ioreg_info = self.parse_ioreg_data(ioreg_data)
-                self.battery_data.update(ioreg_info)
-            except Exception as e:
-                print(f"Warning: Failed to get ioreg data: {e}")
+            if ioreg_future is not None:
+                try:
+                    ioreg_info = self.parse_ioreg_data(ioreg_future.result())
+                    self.battery_data.update(ioreg_info)
+                except Exception as e:
+                    print(f"Warning: Failed to get ioreg data: {e}")
             
             # 전력 관리 데이터 (Low Power Mode 등)
-            try:
-                pm_data = self.get_power_management_data()
-                pm_info = self.parse_power_management_data(pm_data)
-                self.battery_data.update(pm_info)
-            except Exception as e:
-                print(f"Warning: Failed to get power management data: {e}")
+            if pm_future is not None:
+                try:
+                    pm_info = pm_future.result()
+                    self.battery_data.update(pm_info)
+                except Exception as e:
+                    print(f"Warning: Failed to get power management data: {e}")
             
             # 하드웨어 정보
-            try:
-                hw_data = self.get_hardware_info()
-                hw_info = self.parse_hardware_info(hw_data)
-                self.battery_data.update(hw_info)
-            except Exception as e:
-                print(f"Warning: Failed to get hardware info: {e}")
+            if hw_future is not None:
+                try:
+                    self._hw_info = self.parse_hardware_info(hw_future.result())
+                except Exception as e:
+                    print(f"Warning: Failed to get hardware info: {e}")
+            # 동적 값만 갱신한 경우에도 마지막에 반영 (ioreg의 배터리 Serial보다 Mac 시리얼 우선)
+            self.battery_data.update(self._hw_info)
             
             # iOS 디바이스 확인
-            try:
-                self.ios_devices = self.check_ios_devices()
-            except Exception as e:
-                print(f"Warning: Failed to check iOS devices: {e}")
-                self.ios_devices = []
-                
+            if ios_future is not None:
+                try:
+                    self.ios_devices = ios_future.result()
+                except Exception as e:
+                    print(f"Warning: Failed to check iOS devices: {e}")
+                    self.ios_devices = []
+            
+            if static:
+                self._static_collected = True
+            
+            # 표시용 단위 변환은 수집 직후 한 번만 수행
+            self._normalize_battery_data()
+        
         except Exception as e:
             print(f"Error in collect_all_data: {e}")
             import traceback
@@ -752,72 +1310,100 @@ class BatteryMonitor:
             # Ensure ios_devices is always a list
             if not hasattr(self, 'ios_devices'):
                 self.ios_devices = []
+    
+    def _normalize_battery_data(self):
+        """원시 값을 표시 단위로 변환해 battery_data에 저장 (표시할 때마다 다시 계산하지 않도록)"""
+        data = self.battery_data
+        conversions = (
+            ('voltage_v', 'voltage', self.format_voltage),
+            ('amperage_ma', 'amperage', self.format_amperage),
+            ('temperature_c', 'temperature', self.format_temperature),
+            ('average_temperature_c', 'average_temperature', self.format_temperature),
+            ('time_remaining_text', 'time_remaining', self.format_time_remaining),
+        )
+        for target, source, convert in conversions:
+            try:
+                data[target] = convert(data[source]) if data.get(source) else None
+            except (TypeError, ValueError):
+                data[target] = None
+        
+        try:
+            data['health_percentage'] = self.calculate_battery_health()
+        except (TypeError, ValueError, ZeroDivisionError):
+            data['health_percentage'] = None
         
+        # 충전 상태를 한 번만 판정해 코드로 저장 (표시 측은 튜플 인덱싱만 수행)
+        get = data.get
+        data['charge_state'] = (
+            ((get('is_charging') or get('charging')) == 'Yes') * 3
+            or (get('fully_charged') == 'Yes') * 2
+            or (get('external_connected') == 'Yes') * 1
+        )
+    
+    def _normalize_ios_device(self, device):
+        """iOS 배터리 잔량 문자열을 숫자(battery_level)로 한 번만 변환 (변환 불가 시 None)"""
+        try:
+            device['battery_level'] = float(device['battery_capacity'])
+        except (KeyError, TypeError, ValueError):
+            device['battery_level'] = None
+    
     def display_battery_info(self):
         """배터리 정보를 보기 좋게 표시"""
         if not self.battery_data:
             print("배터리 정보를 가져올 수 없습니다.")
             return
         
-        print("\n" + "="*60)
-        print("🔋 배터리 모니터 - macOS Battery Info")
-        print("="*60)
+        # 출력할 줄을 모아 두었다가 마지막에 한 번만 출력
+        lines = []
+        out = lines.append
+        
+        out("\n" + "="*60)
+        out("🔋 배터리 모니터 - macOS Battery Info")
+        out("="*60)
         
         # 기본 정보
-        print(f"📱 디바이스: {self.battery_data.get('device_name', 'N/A')}")
-        print(f"🔢 시리얼: {self.battery_data.get('serial', 'N/A')}")
-        print(f"💾 펌웨어: {self.battery_data.get('firmware_version', 'N/A')}")
+        out(f"📱 디바이스: {self.battery_data.get('device_name', 'N/A')}")
+        out(f"🔢 시리얼: {self.battery_data.get('serial', 'N/A')}")
+        out(f"💾 펌웨어: {self.battery_data.get('firmware_version', 'N/A')}")
         
-        print("\n" + "-"*40)
-        print("📊 현재 상태")
-        print("-"*40)
+        out("\n" + "-"*40)
+        out("📊 현재 상태")
+        out("-"*40)
         
         # 현재 충전량
         current_capacity = self.battery_data.get('current_capacity')
         if current_capacity:
-            print(f"🔋 현재 충전량: {current_capacity}%")
+            out(f"🔋 현재 충전량: {current_capacity}%")
         
         # 충전 상태
-        is_charging = self.battery_data.get('is_charging', self.battery_data.get('charging'))
-        fully_charged = self.battery_data.get('fully_charged')
-        external_connected = self.battery_data.get('external_connected')
-        
-        if is_charging == 'Yes':
-            print("⚡ 상태: 충전 중")
-        elif fully_charged == 'Yes':
-            print("✅ 상태: 충전 완료")
-        elif external_connected == 'Yes':
-            print("🔌 상태: 어댑터 연결됨 (충전 안함)")
-        else:
-            print("🔋 상태: 배터리 사용 중")
+        out(_CHARGE_STATE_TEXT[self.battery_data.get('charge_state', 0)])
         
         # 남은 시간
-        time_remaining = self.battery_data.get('time_remaining')
-        if time_remaining:
-            formatted_time = self.format_time_remaining(time_remaining)
-            print(f"⏱️  남은 시간: {formatted_time}")
+        formatted_time = self.battery_data.get('time_remaining_text')
+        if formatted_time:
+            out(f"⏱️  남은 시간: {formatted_time}")
         
-        print("\n" + "-"*40)
-        print("🏥 배터리 건강도")
-        print("-"*40)
+        out("\n" + "-"*40)
+        out("🏥 배터리 건강도")
+        out("-"*40)
         
         # 사이클 수
         cycle_count = self.battery_data.get('cycle_count')
         if cycle_count:
-            print(f"🔄 사이클 수: {cycle_count}회")
+            out(f"🔄 사이클 수: {cycle_count}회")
         
         # 최대 용량 (건강도)
-        health = self.calculate_battery_health()
+        health = self.battery_data.get('health_percentage')
         if health:
-            print(f"💚 배터리 건강도: {health}%")
+            out(f"💚 배터리 건강도: {health}%")
         
         condition = self.battery_data.get('condition')
         if condition:
-            print(f"🏥 컨디션: {condition}")
+            out(f"🏥 컨디션: {condition}")
         
-        print("\n" + "-"*40)
-        print("🔧 기술적 정보")
-        print("-"*40)
+        out("\n" + "-"*40)
+        out("🔧 기술적 정보")
+        out("-"*40)
         
         # 설계 용량 vs 현재 최대 용량
         design_capacity = self.battery_data.get('design_capacity')
@@ -825,59 +1411,55 @@ class BatteryMonitor:
         apple_raw_current = self.battery_data.get('apple_raw_current_capacity')
         
         if design_capacity:
-            print(f"🏭 설계 용량: {design_capacity} mAh")
+            out(f"🏭 설계 용량: {design_capacity} mAh")
         if apple_raw_max:
-            print(f"📊 현재 최대 용량: {apple_raw_max} mAh")
+            out(f"📊 현재 최대 용량: {apple_raw_max} mAh")
         if apple_raw_current:
-            print(f"⚡ 현재 용량: {apple_raw_current} mAh")
+            out(f"⚡ 현재 용량: {apple_raw_current} mAh")
         
         # 온도 표시 (임시 주석 처리 - 단위 변환 문제로 인해)
-        # avg_temp = self.battery_data.get('average_temperature')
-        # temperature = self.battery_data.get('temperature')
+        # avg_temp = self.battery_data.get('average_temperature_c')
+        # temperature = self.battery_data.get('temperature_c')
         # 
         # if avg_temp:
-        #     temp_celsius = self.format_temperature(avg_temp)
-        #     print(f"🌡️  평균 온도: {temp_celsius}°C")
+        #     out(f"🌡️  평균 온도: {avg_temp}°C")
         # elif temperature:
-        #     temp_celsius = self.format_temperature(temperature)
-        #     print(f"🌡️  온도: {temp_celsius}°C")
+        #     out(f"🌡️  온도: {temperature}°C")
         
         # 전압
-        voltage = self.battery_data.get('voltage')
-        if voltage:
-            voltage_v = self.format_voltage(voltage)
-            print(f"⚡ 전압: {voltage_v}V")
+        voltage_v = self.battery_data.get('voltage_v')
+        if voltage_v:
+            out(f"⚡ 전압: {voltage_v}V")
         
         # 전류
-        amperage = self.battery_data.get('amperage')
-        if amperage:
-            amperage_ma = self.format_amperage(amperage)
-            print(f"🔌 전류: {amperage_ma} mA")
+        amperage_ma = self.battery_data.get('amperage_ma')
+        if amperage_ma:
+            out(f"🔌 전류: {amperage_ma} mA")
         
         # iOS 디바이스 정보 표시
         if self.ios_devices:
-            print("\n" + "-"*40)
-            print("📱 연결된 iOS 디바이스")
-            print("-"*40)
+            out("\n" + "-"*40)
+            out("📱 연결된 iOS 디바이스")
+            out("-"*40)
             
             for i, device in enumerate(self.ios_devices, 1):
-                print(f"📱 디바이스 #{i}:")
-                print(f"  • 이름: {device.get('name', 'N/A')}")
-                print(f"  • 모델: {device.get('model', 'N/A')}")
+                out(f"📱 디바이스 #{i}:")
+                out(f"  • 이름: {device.get('name', 'N/A')}")
+                out(f"  • 모델: {device.get('model', 'N/A')}")
                 if 'ios_version' in device and device['ios_version'] != 'Unknown':
-                    print(f"  • iOS: {device['ios_version']}")
+                    out(f"  • iOS: {device['ios_version']}")
                 if 'serial' in device and device['serial'] != 'Unknown':
-                    print(f"  • 시리얼: {device['serial']}")
-                print(f"  • 연결: {device.get('connection', 'USB')}")
+                    out(f"  • 시리얼: {device['serial']}")
+                out(f"  • 연결: {device.get('connection', 'USB')}")
                 
                 # 배터리 정보 표시 (libimobiledevice로 가져온 경우)
                 if 'battery_capacity' in device and device['battery_capacity'] != 'Unknown':
-                    print(f"  🔋 배터리 잔량: {device['battery_capacity']}%")
+                    out(f"  🔋 배터리 잔량: {device['battery_capacity']}%")
                 if 'battery_charging' in device and device['battery_charging'] != 'Unknown':
                     charging_status = "충전 중" if device['battery_charging'] == 'True' else "방전 중"
-                    print(f"  ⚡ 충전 상태: {charging_status}")
+                    out(f"  ⚡ 충전 상태: {charging_status}")
                 if 'battery_voltage' in device and device['battery_voltage'] != 'Unknown':
-                    print(f"  ⚡ 전압: {device['battery_voltage']}V")
+                    out(f"  ⚡ 전압: {device['battery_voltage']}V")
                 
                 # 배터리 건강도 및 사이클 정보 표시
                 if 'battery_health' in device and device['battery_health'] != 'Unknown':
@@ -893,34 +1475,38 @@ class BatteryMonitor:
                     except ValueError:
                         health_status = ""
                     
-                    print(f"  💚 배터리 건강도: {device['battery_health']}% {health_status}")
+                    out(f"  💚 배터리 건강도: {device['battery_health']}% {health_status}")
                 
                 if 'cycle_count' in device and device['cycle_count'] != 'Unknown':
-                    print(f"  🔄 사이클 수: {device['cycle_count']}회")
+                    out(f"  🔄 사이클 수: {device['cycle_count']}회")
                 
                 if 'design_capacity' in device and device['design_capacity'] != 'Unknown':
-                    print(f"  🏢 설계 용량: {device['design_capacity']} mAh")
+                    out(f"  🏢 설계 용량: {device['design_capacity']} mAh")
                 
                 if 'nominal_charge_capacity' in device and device['nominal_charge_capacity'] != 'Unknown':
-                    print(f"  📊 현재 최대 용량: {device['nominal_charge_capacity']} mAh")
+                    out(f"  📊 현재 최대 용량: {device['nominal_charge_capacity']} mAh")
                 
                 # 방식에 따른 알림 메시지
                 if device.get('method') == 'MobileDevice.framework':
-                    print(f"  ✅ CoconutBattery 방식으로 연결 성공!")
-                elif not shutil.which('ideviceinfo'):
-                    print(f"  ⚠️  상세 정보를 위해 'brew install libimobiledevice' 설치 권장")
-                print()
+                    out(f"  ✅ CoconutBattery 방식으로 연결 성공!")
+                elif not self._bin['ideviceinfo']:
+                    out(f"  ⚠️  상세 정보를 위해 'brew install libimobiledevice' 설치 권장")
+                out('')
         else:
-            if not shutil.which('ideviceinfo'):
-                print("\n" + "-"*40)
-                print("📱 iOS 디바이스")
-                print("-"*40)
-                print("🔍 연결된 iOS 디바이스가 없습니다.")
-                print("📝 디바이스 연결 후 'brew install libimobiledevice'로 더 상세한 정보를 얻을 수 있습니다.")
-        
-        print("\n" + "="*60)
-        print(f"🕐 업데이트: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        print("="*60)
+            if not self._bin['ideviceinfo']:
+                out("\n" + "-"*40)
+                out("📱 iOS 디바이스")
+                out("-"*40)
+                out("🔍 연결된 iOS 디바이스가 없습니다.")
+                out("📝 디바이스 연결 후 'brew install libimobiledevice'로 더 상세한 정보를 얻을 수 있습니다.")
+        
+        out("\n" + "="*60)
+        out(f"🕐 업데이트: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        out("="*60)
+        
+        # 줄 단위 print 대신 한 번에 출력 (stdout 쓰기 1회)
+        print('\n'.join(lines))
+
 
 def main():
     """메인 함수"""
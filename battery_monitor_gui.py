@@ -6,7 +6,10 @@ Battery monitoring tool with a modern, graphical UI
 
 import tkinter as tk
 from tkinter import ttk, messagebox, Canvas
+import tkinter.font as tkFont
 import threading
+import queue
+import re
 import math
 from datetime import datetime
 import sys
@@ -16,6 +19,11 @@ import os
 from battery_monitor import BatteryMonitor
 from battery_history import BatteryHistoryManager
 
+try:
+    from tkthread import TkThread  # Optional: signals the main thread via Tcl thread::send
+except ImportError:
+    TkThread = None
+
 # Color Palette (macOS inspired)
 COLORS = {
     'bg': '#F5F5F7',
@@ -30,7 +38,110 @@ COLORS = {
     'shadow': '#000000'
 }
 
+# Colors used by nearly every card widget, bound once instead of looked up per widget
+_CARD_BG = COLORS['card_bg']
+_TEXT = COLORS['text']
+_TEXT_SECONDARY = COLORS['text_secondary']
+
+# ttk style fonts, built once and shared by every configure call
+_FONT = 'Helvetica'
+_STYLE_FONTS = {
+    'Header.TLabel': (_FONT, 24, 'bold'),
+    'Section.TLabel': (_FONT, 13, 'bold'),
+    'CardTitle.TLabel': (_FONT, 16, 'bold'),
+    'CardValue.TLabel': (_FONT, 28, 'bold'),
+    'CardLabel.TLabel': (_FONT, 12),
+    'CardSmall.TLabel': (_FONT, 11),
+    'Action.TButton': (_FONT, 12),
+}
+
+# Widget/canvas fonts: name -> (family, size, weight). Built once into tkFont.Font objects.
+_WIDGET_FONTS = {
+    'loading': (_FONT, 13, 'normal'),
+    'mac_icon': ('Apple Color Emoji', 30, 'normal'),
+    'mac_title': (_FONT, 16, 'bold'),
+    'mac_percent': (_FONT, 36, 'bold'),
+    'ios_icon': ('Apple Color Emoji', 24, 'normal'),
+    'ios_title': (_FONT, 14, 'bold'),
+    'ios_percent': (_FONT, 20, 'bold'),
+    'empty_icon': ('Arial', 24, 'normal'),
+    'bolt': ('Arial', 14, 'normal'),
+    'body': (_FONT, 12, 'normal'),
+    'small': (_FONT, 11, 'normal'),
+    'small_bold': (_FONT, 11, 'bold'),
+    'caption': (_FONT, 8, 'normal'),
+}
+
+# ttk styles live in the Tcl interpreter; the app has a single Tk root, so configure them once
+_STYLES_CONFIGURED = False
+
+# Indexed by battery_data['charge_state'] (computed once per collection by BatteryMonitor)
+_STATUS_TEXT = ("Discharging", "AC Connected", "Full", "Charging")
+_CHARGE_STATE_CHARGING = 3
+
+# Health donut colors, indexed by health percentage 0-100 (<60 red, <80 yellow, else green)
+_DONUT_COLOR_TABLE = (
+    (COLORS['accent_red'],) * 60 + (COLORS['accent_yellow'],) * 20 + (COLORS['accent_green'],) * 21
+)
+
+# Mac battery bar colors, indexed by charge percentage 0-100 (<=20 red, <=50 yellow, else green)
+_BAR_COLOR_TABLE = (
+    (COLORS['accent_red'],) * 21 + (COLORS['accent_yellow'],) * 30 + (COLORS['accent_green'],) * 50
+)
+
+# iOS progress colors, indexed by (charge > 20 or charging)
+_CAPACITY_COLORS = (COLORS['accent_red'], COLORS['accent_green'])
+
+_INT_RE = re.compile(r'\s*(-?\d+)')
+
+
+def _to_int(value, default=0):
+    """Leading integer of value (int or numeric string) without raising on malformed input"""
+    if type(value) is int:
+        return value
+    m = _INT_RE.match(str(value))
+    return int(m.group(1)) if m else default
+
+
+class DetailRow:
+    """
+    A card's label/value row, gridded straight into the section's two columns
+    (no per-row frame). Both Labels are created once, later updates only
+    re-text the value.
+    """
+
+    def __init__(self, parent, row, label, label_font, value_font):
+        self.label = tk.Label(parent, text=label, font=label_font, bg=_CARD_BG, fg=_TEXT_SECONDARY)
+        self.label.grid(row=row, column=0, sticky='w', pady=2)
+        self.value_label = tk.Label(parent, font=value_font, bg=_CARD_BG, fg=_TEXT)
+        self.value_label.grid(row=row, column=1, sticky='e', pady=2)
+        self._value = None
+
+    def set(self, value):
+        if value != self._value:
+            self._value = value
+            self.value_label.configure(text=value)
+
+    def set_visible(self, visible):
+        """grid_remove keeps the row's grid options, so a plain grid() puts it back in place"""
+        if visible == bool(self.label.winfo_manager()):
+            return
+        for widget in (self.label, self.value_label):
+            if visible:
+                widget.grid()
+            else:
+                widget.grid_remove()
+
+
 class ModernBatteryGUI:
+    # Mac detail rows: (label, battery_data key, formatter). Rows whose value is None are hidden.
+    _MAC_DETAIL_FIELDS = (
+        ("Status", 'charge_state', _STATUS_TEXT.__getitem__),
+        ("Time Left", 'time_remaining_text', str),
+        ("Cycles", 'cycle_count', str),
+        ("Temp", 'temperature_c', "{:.1f}°C".format),  # Already converted from Kelvin*10 by the monitor
+    )
+
     def __init__(self):
         self.setup_environment()
         
@@ -40,18 +151,31 @@ class ModernBatteryGUI:
         self.root.geometry("500x700")
         self.root.configure(bg=COLORS['bg'])
         self.root.resizable(True, True)
+
+        # Worker -> UI hand-off (falls back to root.after when tkthread is unavailable)
+        self.tkt = self.init_tkthread()
         
         self.setup_styles()
+        self.setup_fonts()
         
-        # Backend initialization
-        self.battery_monitor = self.safe_init(BatteryMonitor)
-        self.history_manager = self.safe_init(BatteryHistoryManager)
+        # Backends are created on the worker (they touch IOKit/SQLite) so the first frame isn't delayed
+        self.battery_monitor = None
+        self.history_manager = None
+
+        # Single long-lived worker: refreshes and history saves run serially on it
+        self._work_q = queue.Queue()
+        self._shutting_down = False
+        # True while a refresh is queued but not yet started; repeat clicks fold into it
+        self._refresh_queued = False
+        self._worker = threading.Thread(target=self._worker_loop, daemon=True)
+        self._worker.start()
         
         # UI Components
         self.create_widgets()
-        
-        # Start data collection
-        self.root.after(100, self.refresh_data)
+
+        # Start backend initialization, then data collection
+        self.show_loading()
+        self._work_q.put(self._init_backends)
 
     def setup_environment(self):
         """Setup environment variables for macOS"""
@@ -61,6 +185,18 @@ class ModernBatteryGUI:
         except Exception:
             pass
 
+    def _init_backends(self):
+        # Runs on the worker thread
+        self.battery_monitor = self.safe_init(BatteryMonitor)
+        self.history_manager = self.safe_init(BatteryHistoryManager)
+        self.call_in_ui(self.on_backends_ready)
+
+    def on_backends_ready(self):
+        if self.battery_monitor is None:
+            self.hide_loading()
+            return
+        self.refresh_data()
+
     def safe_init(self, cls):
         try:
             return cls()
@@ -68,7 +204,47 @@ class ModernBatteryGUI:
             print(f"Failed to initialize {cls.__name__}: {e}")
             return None
 
+    def init_tkthread(self):
+        if TkThread is None:
+            return None
+        try:
+            return TkThread(self.root)
+        except tk.TclError as e:
+            # Tcl built without the Thread package
+            print(f"tkthread unavailable, using after(): {e}")
+            return None
+
+    def call_in_ui(self, func, *args):
+        """
+        Run func on the Tk main thread without blocking the calling worker.
+        Dropped once the window is closing, so workers never touch a destroyed root.
+        """
+        if self._shutting_down:
+            return
+        try:
+            if self.tkt is not None:
+                self.tkt.nosync(func, *args)
+            else:
+                self.root.after(0, func, *args)
+        except (RuntimeError, tk.TclError):
+            # The root was destroyed between the check above and the call
+            if not self._shutting_down:
+                raise
+
+    def _worker_loop(self):
+        while True:
+            job = self._work_q.get()
+            try:
+                if job is None:  # Shutdown sentinel
+                    return
+                job()
+            finally:
+                self._work_q.task_done()
+
     def setup_styles(self):
+        global _STYLES_CONFIGURED
+        if _STYLES_CONFIGURED:
+            return
         style = ttk.Style()
         try:
             style.theme_use('aqua')
@@ -76,19 +252,28 @@ class ModernBatteryGUI:
             style.theme_use('clam')
             
         style.configure('TFrame', background=COLORS['bg'])
-        style.configure('Card.TFrame', background=COLORS['card_bg'])
+        style.configure('Card.TFrame', background=_CARD_BG)
         
         # Custom Label Styles
-        style.configure('Header.TLabel', background=COLORS['bg'], foreground=COLORS['text'], font=('Helvetica', 24, 'bold'))
-        style.configure('Section.TLabel', background=COLORS['bg'], foreground=COLORS['text_secondary'], font=('Helvetica', 13, 'bold'))
+        style.configure('Header.TLabel', background=COLORS['bg'], foreground=_TEXT, font=_STYLE_FONTS['Header.TLabel'])
+        style.configure('Section.TLabel', background=COLORS['bg'], foreground=_TEXT_SECONDARY, font=_STYLE_FONTS['Section.TLabel'])
         
-        style.configure('CardTitle.TLabel', background=COLORS['card_bg'], foreground=COLORS['text'], font=('Helvetica', 16, 'bold'))
-        style.configure('CardValue.TLabel', background=COLORS['card_bg'], foreground=COLORS['text'], font=('Helvetica', 28, 'bold'))
-        style.configure('CardLabel.TLabel', background=COLORS['card_bg'], foreground=COLORS['text_secondary'], font=('Helvetica', 12))
-        style.configure('CardSmall.TLabel', background=COLORS['card_bg'], foreground=COLORS['text_secondary'], font=('Helvetica', 11))
+        style.configure('CardTitle.TLabel', background=_CARD_BG, foreground=_TEXT, font=_STYLE_FONTS['CardTitle.TLabel'])
+        style.configure('CardValue.TLabel', background=_CARD_BG, foreground=_TEXT, font=_STYLE_FONTS['CardValue.TLabel'])
+        style.configure('CardLabel.TLabel', background=_CARD_BG, foreground=_TEXT_SECONDARY, font=_STYLE_FONTS['CardLabel.TLabel'])
+        style.configure('CardSmall.TLabel', background=_CARD_BG, foreground=_TEXT_SECONDARY, font=_STYLE_FONTS['CardSmall.TLabel'])
 
         # Button Style
-        style.configure('Action.TButton', font=('Helvetica', 12))
+        style.configure('Action.TButton', font=_STYLE_FONTS['Action.TButton'])
+
+        _STYLES_CONFIGURED = True
+
+    def setup_fonts(self):
+        # Font objects are resolved and measured by Tk once, then shared by every widget
+        self.fonts = {
+            name: tkFont.Font(root=self.root, family=family, size=size, weight=weight)
+            for name, (family, size, weight) in _WIDGET_FONTS.items()
+        }
 
     def create_widgets(self):
         # Main Scrollable Container
@@ -96,20 +281,39 @@ class ModernBatteryGUI:
         self.scrollbar = ttk.Scrollbar(self.root, orient="vertical", command=self.canvas.yview)
         self.scroll_frame = ttk.Frame(self.canvas, style='TFrame')
 
-        self.scroll_frame.bind(
-            "<Configure>",
-            lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all"))
-        )
+        # Child resizes are coalesced into one scrollregion update per idle cycle
+        self._scrollregion_pending = False
+        self.scroll_frame.bind("<Configure>", self._schedule_scrollregion_update)
 
         self.canvas_window = self.canvas.create_window((0, 0), window=self.scroll_frame, anchor="nw")
-        self.canvas.configure(yscrollcommand=self.scrollbar.set)
+        self.canvas.configure(yscrollcommand=self.on_canvas_yscroll)
+        self._ios_render_pending = False
         
         # Layout
         self.canvas.pack(side="left", fill="both", expand=True)
         self.scrollbar.pack(side="right", fill="y")
 
         # Bind resize to adjust width (bind to canvas, not root, to get correct width)
+        self._pending_width = None
+        self._resize_after_id = None
         self.canvas.bind('<Configure>', self.on_window_resize)
+
+        # Data arriving while minimized is rendered when the window is restored
+        self._render_on_map = False
+        self.root.bind('<Map>', self.on_root_map)
+
+        # Wheel scrolling only while the pointer is over the canvas, so other
+        # windows (e.g. the History viewer) don't scroll this one
+        self.canvas.bind('<Enter>', self.on_canvas_enter)
+        self.canvas.bind('<Leave>', self.on_canvas_leave)
+        # Wheel ticks arriving within one event-loop pass are applied as a single scroll
+        self._pending_scroll = 0
+        self._scroll_flush_id = None
+
+        # Scroll activity tracking: refreshes are deferred while the user is scrolling
+        self._scrolling = False
+        self._scroll_idle_id = None
+        self.scrollbar.bind('<B1-Motion>', self.mark_scrolling, add='+')
         
         # Header
         header_frame = ttk.Frame(self.scroll_frame, style='TFrame', padding=(20, 20, 20, 10))
@@ -129,34 +333,115 @@ class ModernBatteryGUI:
         # Placeholders for dynamic content
         self.mac_card = None
         self.ios_container = None
+        self.empty_state_card = None
+        self._last_ui_key = None
+        self._ios_cards = {}
+        self._ios_card_pool = []  # Hidden cards of disconnected devices, reused for new ones
+        self._row_widgets = {}
+        self._canvas_items = {}  # canvas -> item ids drawn by the draw_* helpers
+        self._text_cache = {}  # (widget, canvas item or None) -> last text set
+        self._section_rows = {}
 
         # Loading overlay
         self.loading_overlay = None
         self.spinner_angle = 0
         self.spinner_animating = False
+        self.spinner_after_id = None
+
+    def _schedule_scrollregion_update(self, event=None):
+        if not self._scrollregion_pending:
+            self._scrollregion_pending = True
+            self.root.after_idle(self._apply_scrollregion)
+
+    def _apply_scrollregion(self):
+        self._scrollregion_pending = False
+        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
 
     def on_window_resize(self, event):
         # Adjust the width of the inner frame to match the canvas
         # Since we bind to the canvas, event.width is the canvas's actual width
+        # Drags fire many events; only the last width within 50ms is applied
         if event.widget == self.canvas:
-            self.canvas.itemconfig(self.canvas_window, width=event.width)
+            self._pending_width = event.width
+            if self._resize_after_id is not None:
+                self.root.after_cancel(self._resize_after_id)
+            self._resize_after_id = self.root.after(50, self._apply_resize)
+
+    def _apply_resize(self):
+        self._resize_after_id = None
+        self.canvas.itemconfig(self.canvas_window, width=self._pending_width)
+
+    def on_canvas_yscroll(self, first, last):
+        self.scrollbar.set(first, last)
+        # Cards scrolled into view may still hold data from an earlier refresh
+        self.schedule_ios_render()
+
+    def schedule_ios_render(self):
+        if not self._ios_render_pending:
+            self._ios_render_pending = True
+            self.root.after_idle(self.render_visible_ios_cards)
+
+    def on_canvas_enter(self, event):
+        self.canvas.bind_all('<MouseWheel>', self.on_mousewheel)
+
+    def on_canvas_leave(self, event):
+        # Moving onto the embedded scroll_frame window also sends the canvas a <Leave>
+        # (detail NotifyInferior); the pointer is still over the canvas then
+        if event.detail != 'NotifyInferior':
+            self.canvas.unbind_all('<MouseWheel>')
+
+    def on_mousewheel(self, event):
+        # One unit per wheel event; only the sign of delta matters (macOS reports small deltas)
+        if not event.delta:
+            return  # Trackpad momentum can end with zero-delta events; they must not scroll down
+        self._pending_scroll += -1 if event.delta > 0 else 1
+        if self._scroll_flush_id is None:
+            self._scroll_flush_id = self.root.after_idle(self._flush_scroll)
+        self.mark_scrolling()
+
+    def _flush_scroll(self):
+        self._scroll_flush_id = None
+        units, self._pending_scroll = self._pending_scroll, 0
+        if units:
+            self.canvas.yview_scroll(units, 'units')
+
+    def mark_scrolling(self, event=None):
+        # Scrolling counts as active until 150ms pass without another scroll event
+        self._scrolling = True
+        if self._scroll_idle_id is not None:
+            self.root.after_cancel(self._scroll_idle_id)
+        self._scroll_idle_id = self.root.after(150, self._clear_scrolling)
+
+    def _clear_scrolling(self):
+        self._scrolling = False
+        self._scroll_idle_id = None
 
     def show_loading(self):
-        """Show a loading overlay with animated spinner"""
-        if self.loading_overlay:
+        """Show the loading overlay with animated spinner (built once, re-placed on later refreshes)"""
+        if self.spinner_animating:
             return
-        self.loading_overlay = tk.Frame(self.root, bg=COLORS['bg'])
-        self.loading_overlay.place(relx=0, rely=0, relwidth=1, relheight=1)
-
-        # Center container
-        center = tk.Frame(self.loading_overlay, bg=COLORS['bg'])
-        center.place(relx=0.5, rely=0.45, anchor='center')
+        if self.loading_overlay is None:
+            self.loading_overlay = tk.Frame(self.root, bg=COLORS['bg'])
+
+            # Center container
+            center = tk.Frame(self.loading_overlay, bg=COLORS['bg'])
+            center.place(relx=0.5, rely=0.45, anchor='center')
+
+            self.spinner_canvas = Canvas(center, width=60, height=60, bg=COLORS['bg'], highlightthickness=0)
+            self.spinner_canvas.pack()
+            cx, cy, r = 30, 30, 20
+            # Background ring
+            self.spinner_canvas.create_oval(cx - r, cy - r, cx + r, cy + r, outline='#E5E5EA', width=4)
+            # Spinning arc; only its start angle changes per frame
+            self.spinner_arc = self.spinner_canvas.create_arc(cx - r, cy - r, cx + r, cy + r,
+                                                              start=0, extent=90,
+                                                              outline=COLORS['accent_blue'], width=4, style='arc')
+
+            tk.Label(center, text="Reading battery data...", font=self.fonts['loading'],
+                     bg=COLORS['bg'], fg=_TEXT_SECONDARY).pack(pady=(12, 0))
 
-        self.spinner_canvas = Canvas(center, width=60, height=60, bg=COLORS['bg'], highlightthickness=0)
-        self.spinner_canvas.pack()
-
-        tk.Label(center, text="Reading battery data...", font=('Helvetica', 13),
-                 bg=COLORS['bg'], fg=COLORS['text_secondary']).pack(pady=(12, 0))
+        self.loading_overlay.place(relx=0, rely=0, relwidth=1, relheight=1)
+        self.loading_overlay.lift()
 
         self.spinner_angle = 0
         self.spinner_animating = True
@@ -164,26 +449,21 @@ class ModernBatteryGUI:
 
     def animate_spinner(self):
         """Animate the loading spinner"""
-        if not self.spinner_animating or not self.loading_overlay:
+        self.spinner_after_id = None
+        if not self.spinner_animating:
             return
-        c = self.spinner_canvas
-        c.delete('all')
-        cx, cy, r = 30, 30, 20
-        # Background ring
-        c.create_oval(cx - r, cy - r, cx + r, cy + r, outline='#E5E5EA', width=4)
-        # Spinning arc
-        c.create_arc(cx - r, cy - r, cx + r, cy + r,
-                     start=self.spinner_angle, extent=90,
-                     outline=COLORS['accent_blue'], width=4, style='arc')
+        self.spinner_canvas.itemconfigure(self.spinner_arc, start=self.spinner_angle)
         self.spinner_angle = (self.spinner_angle + 15) % 360
-        self.root.after(40, self.animate_spinner)
+        self.spinner_after_id = self.root.after(40, self.animate_spinner)
 
     def hide_loading(self):
-        """Hide the loading overlay"""
+        """Hide the loading overlay (kept for reuse)"""
         self.spinner_animating = False
-        if self.loading_overlay:
-            self.loading_overlay.destroy()
-            self.loading_overlay = None
+        if self.spinner_after_id is not None:
+            self.root.after_cancel(self.spinner_after_id)
+            self.spinner_after_id = None
+        if self.loading_overlay is not None:
+            self.loading_overlay.place_forget()
 
     def refresh_data(self):
         if not self.battery_monitor:
@@ -191,15 +471,26 @@ class ModernBatteryGUI:
 
         self.show_loading()
 
+        # A queued refresh hasn't collected yet, so it will pick up current data anyway
+        if self._refresh_queued:
+            return
+
         def task():
+            self._refresh_queued = False
             try:
                 self.battery_monitor.collect_all_data()
-                self.root.after(0, self.on_data_ready)
+                # Snapshot what this collection produced; history is saved from it on this worker
+                mac_data = dict(self.battery_monitor.battery_data)
+                ios_devices = list(self.battery_monitor.ios_devices)
+                self.call_in_ui(self.on_data_ready)
+                if self.history_manager:
+                    self.save_history(mac_data, ios_devices)
             except Exception as e:
                 print(f"Error collecting data: {e}")
-                self.root.after(0, self.hide_loading)
+                self.call_in_ui(self.hide_loading)
 
-        threading.Thread(target=task, daemon=True).start()
+        self._refresh_queued = True
+        self._work_q.put(task)
 
     def on_data_ready(self):
         """Called when data collection is complete"""
@@ -207,29 +498,70 @@ class ModernBatteryGUI:
         self.update_ui()
 
     def update_ui(self):
-        # Clear previous content
-        for widget in self.content_frame.winfo_children():
-            widget.destroy()
+        if self.battery_monitor is None:
+            return
+
+        # Don't relayout cards mid-scroll; try again shortly
+        if self._scrolling:
+            self.root.after(200, self.update_ui)
+            return
+
+        # Nothing is visible while minimized; render once on restore instead
+        if self.root.state() == 'iconic':
+            self._render_on_map = True
+            return
 
         data = self.battery_monitor.battery_data
-        
-        # --- macOS Battery Card ---
-        self.create_mac_card(data)
 
-        # --- iOS Devices ---
-        ios_label = ttk.Label(self.content_frame, text="CONNECTED DEVICES", style='Section.TLabel')
-        ios_label.pack(fill='x', pady=(20, 10))
+        # Skip the widget pass when nothing displayed could have changed
+        # (compared with ==, so unhashable values in the dicts are fine)
+        ui_key = (tuple(sorted((data or {}).items())),
+                  tuple(tuple(sorted(d.items())) for d in self.battery_monitor.ios_devices))
+        if ui_key != self._last_ui_key:
+            self._last_ui_key = ui_key
+            self.render_cards(data)
+
+    def on_root_map(self, event):
+        # <Map> on the root also fires for its children; only the window itself matters
+        if event.widget is self.root and self._render_on_map:
+            self._render_on_map = False
+            self.update_ui()
+
+    def render_cards(self, data):
+        # Hold geometry propagation while rows are updated, then lay out once
+        self.scroll_frame.pack_propagate(False)
+        try:
+            # --- macOS Battery Card ---
+            # Cards are built once and then updated in place on every refresh
+            first_build = self.mac_card is None
+            if first_build:
+                self.create_mac_card()
 
-        if self.battery_monitor.ios_devices:
-            for device in self.battery_monitor.ios_devices:
-                self.create_ios_card(device)
-        else:
-            self.create_empty_state_card("No iOS devices connected")
-            
-        # Save history
-        if self.history_manager:
-            threading.Thread(target=self.save_history, daemon=True).start()
+            self.update_mac_card(data)
+
+            if first_build:
+                # Attach the fully populated subtrees in one step each, so the
+                # geometry manager sees the final tree instead of every intermediate pack
+                self.mac_card.pack(fill='x', pady=(0, 10))
+
+                ios_label = ttk.Label(self.content_frame, text="CONNECTED DEVICES", style='Section.TLabel')
+                ios_label.pack(fill='x', pady=(20, 10))
+
+                self.ios_container = ttk.Frame(self.content_frame, style='TFrame')
+
+            # --- iOS Devices ---
+            self.update_ios_cards(self.battery_monitor.ios_devices)
+
+            if first_build:
+                self.ios_container.pack(fill='x')
+        finally:
+            # No update_idletasks() here: forcing a synchronous layout pass per refresh
+            # is the "update considered harmful" pattern; Tk lays the tree out once at idle
+            self.scroll_frame.pack_propagate(True)
 
+        # Card positions are known only after layout, which runs in the idle queue first
+        self.schedule_ios_render()
+    
     def create_card_frame(self, parent):
         """Creates a styled card frame"""
         # Using a canvas to draw a rounded rect background would be ideal, 
@@ -237,217 +569,339 @@ class ModernBatteryGUI:
         # To make it look like a card, we can add a border or shadow if we want, 
         # but a clean white box on gray bg is sufficient for modern flat UI.
         
-        frame = tk.Frame(parent, bg=COLORS['card_bg'], padx=20, pady=20)
+        frame = tk.Frame(parent, bg=_CARD_BG, padx=20, pady=20)
         # Add subtle border effect if desired, or just rely on color contrast
         return frame
-
-    def create_mac_card(self, data):
+    
+    def create_mac_card(self):
+        # Packed by render_cards once its rows are populated
         card = self.create_card_frame(self.content_frame)
-        card.pack(fill='x', pady=(0, 10))
 
         # Top Row: Icon + Name + Percentage
-        top_row = tk.Frame(card, bg=COLORS['card_bg'])
+        top_row = tk.Frame(card, bg=_CARD_BG)
         top_row.pack(fill='x', pady=(0, 15))
-
+        
         # Icon (Text based for now, can be image)
-        device_name = data.get('device_name', 'MacBook')
-        tk.Label(top_row, text="💻", font=("Apple Color Emoji", 30), bg=COLORS['card_bg']).pack(side='left', padx=(0, 10))
+        tk.Label(top_row, text="💻", font=self.fonts['mac_icon'], bg=_CARD_BG).pack(side='left', padx=(0, 10))
         
-        name_frame = tk.Frame(top_row, bg=COLORS['card_bg'])
+        name_frame = tk.Frame(top_row, bg=_CARD_BG)
         name_frame.pack(side='left')
-        tk.Label(name_frame, text=device_name, font=('Helvetica', 16, 'bold'), bg=COLORS['card_bg'], fg=COLORS['text']).pack(anchor='w')
-        tk.Label(name_frame, text=data.get('serial', 'Unknown Serial'), font=('Helvetica', 11), bg=COLORS['card_bg'], fg=COLORS['text_secondary']).pack(anchor='w')
-
+        self.mac_name_label = tk.Label(name_frame, font=self.fonts['mac_title'], bg=_CARD_BG, fg=_TEXT)
+        self.mac_name_label.pack(anchor='w')
+        self.mac_serial_label = tk.Label(name_frame, font=self.fonts['small'], bg=_CARD_BG, fg=_TEXT_SECONDARY)
+        self.mac_serial_label.pack(anchor='w')
+        
         # Big Percentage
-        try:
-            current = int(data.get('current_capacity', 0))
-        except:
-            current = 0
-            
-        tk.Label(top_row, text=f"{current}%", font=('Helvetica', 36, 'bold'), bg=COLORS['card_bg'], fg=COLORS['text']).pack(side='right')
-
+        self.mac_percent_label = tk.Label(top_row, font=self.fonts['mac_percent'], bg=_CARD_BG, fg=_TEXT)
+        self.mac_percent_label.pack(side='right')
+        
         # Visual Battery Indicator
-        self.draw_battery_bar(card, current, self.get_charging_status(data))
-
+        self.mac_battery_bar = Canvas(card, height=24, width=300, bg=_CARD_BG, highlightthickness=0)
+        self.mac_battery_bar.pack(pady=10)
+        
         # Stats Grid
-        stats_frame = tk.Frame(card, bg=COLORS['card_bg'])
+        stats_frame = tk.Frame(card, bg=_CARD_BG)
         stats_frame.pack(fill='x', pady=20)
         stats_frame.grid_columnconfigure(0, weight=1)
         stats_frame.grid_columnconfigure(1, weight=1)
-
+        
         # Health Donut
-        health_container = tk.Frame(stats_frame, bg=COLORS['card_bg'])
+        health_container = tk.Frame(stats_frame, bg=_CARD_BG)
         health_container.grid(row=0, column=0, sticky='nsew')
         
-        health_val = self.battery_monitor.calculate_battery_health() or 0
-        self.draw_donut_chart(health_container, health_val, "Health")
-
+        self.mac_health_donut = Canvas(health_container, width=100, height=100, bg=_CARD_BG, highlightthickness=0)
+        self.mac_health_donut.pack()
+        
         # Details Column
-        details_container = tk.Frame(stats_frame, bg=COLORS['card_bg'], padx=20)
-        details_container.grid(row=0, column=1, sticky='nsew')
-
-        self.add_detail_row(details_container, "Status", self.get_charging_status_text(data))
-        
-        time_rem = data.get('time_remaining')
-        if time_rem:
-             self.add_detail_row(details_container, "Time Left", self.battery_monitor.format_time_remaining(time_rem))
-        
-        cycle = data.get('cycle_count')
-        if cycle:
-            self.add_detail_row(details_container, "Cycles", f"{cycle}")
-
-        temp = data.get('temperature') # Raw value often needs formatting
-        if temp:
-             # Basic check if it's likely Celsius or Kelvin*10
-             try:
-                 t = float(temp)
-                 if t > 100: t = (t / 10.0) - 273.15
-                 self.add_detail_row(details_container, "Temp", f"{t:.1f}°C")
-             except:
-                 pass
-
-    def create_ios_card(self, device):
-        card = self.create_card_frame(self.content_frame)
-        card.pack(fill='x', pady=(0, 10))
-
-        top_row = tk.Frame(card, bg=COLORS['card_bg'])
-        top_row.pack(fill='x', pady=(0, 10))
-
-        # Icon
+        self.mac_details = tk.Frame(stats_frame, bg=_CARD_BG, padx=20)
+        self.mac_details.grid(row=0, column=1, sticky='nsew')
+        self.mac_details.columnconfigure(1, weight=1)
+        
+        self.mac_card = card
+    
+    def update_mac_card(self, data):
+        self.set_text(self.mac_name_label, data.get('device_name', 'MacBook'))
+        self.set_text(self.mac_serial_label, data.get('serial', 'Unknown Serial'))
+        
+        current = _to_int(data.get('current_capacity'))
+        
+        self.set_text(self.mac_percent_label, f"{current}%")
+        
+        self.draw_battery_bar(self.mac_battery_bar, current, self.get_charging_status(data))
+        
+        health_val = data.get('health_percentage') or 0
+        self.draw_donut_chart(self.mac_health_donut, health_val, "Health")
+        
+        # Rows without a value are hidden rather than destroyed
+        get = data.get
+        for label, key, fmt in self._MAC_DETAIL_FIELDS:
+            value = get(key)
+            self.ensure_row('mac', self.mac_details, label, None if value is None else fmt(value))
+    
+    def update_ios_cards(self, devices):
+        """Update iOS cards in place; cards of removed devices are hidden and pooled, never destroyed"""
+        seen = set()
+        for device in devices:
+            key = device.get('device_id') or device.get('serial') or device.get('name')
+            seen.add(key)
+            card = self._ios_cards.get(key)
+            if card is None:
+                if self._ios_card_pool:
+                    card = self._ios_card_pool.pop()
+                    card['frame'].pack(fill='x', pady=(0, 10))
+                else:
+                    card = self.create_ios_card()
+                self._ios_cards[key] = card
+            # Drawn by render_visible_ios_cards once the card is inside the viewport
+            card['pending'] = device
+
+        for key in [k for k in self._ios_cards if k not in seen]:
+            card = self._ios_cards.pop(key)
+            card['frame'].pack_forget()
+            card['pending'] = None
+            self._ios_card_pool.append(card)
+        
+        if devices:
+            if self.empty_state_card is not None:
+                self.empty_state_card.pack_forget()
+        elif self.empty_state_card is None:
+            self.empty_state_card = self.create_empty_state_card("No iOS devices connected")
+        elif not self.empty_state_card.winfo_manager():
+            self.empty_state_card.pack(fill='x', pady=(0, 10))
+    
+    def render_visible_ios_cards(self):
+        """Apply pending device data only to iOS cards that intersect the visible part of the canvas"""
+        self._ios_render_pending = False
+        top = self.canvas.canvasy(0)
+        bottom = top + self.canvas.winfo_height()
+        origin = self.scroll_frame.winfo_rooty()
+        for card in self._ios_cards.values():
+            device = card['pending']
+            if device is None:
+                continue
+            frame = card['frame']
+            if frame.winfo_height() <= 1:
+                # Not laid out yet; the new card grows the scrollregion, and the
+                # yscrollcommand that follows brings us back here
+                continue
+            card_top = frame.winfo_rooty() - origin
+            if card_top < bottom and card_top + frame.winfo_height() > top:
+                card['pending'] = None
+                self.update_ios_card(card, device)
+
+    def create_ios_card(self):
+        """
+        Create an iOS card as a single Canvas. Every piece of text and the
+        progress bar are canvas items, positioned by update/layout_ios_card.
+        """
+        canvas = Canvas(self.ios_container, bg=_CARD_BG, highlightthickness=0, height=120)
+        canvas.pack(fill='x', pady=(0, 10))
+        
+        pad = 20
+        card = {
+            'frame': canvas,
+            # Icon
+            'icon': canvas.create_text(pad, pad, anchor='nw', font=self.fonts['ios_icon']),
+            # Info
+            'name': canvas.create_text(pad + 44, pad, anchor='nw', font=self.fonts['ios_title'], fill=_TEXT),
+            'model': canvas.create_text(pad + 44, pad + 22, anchor='nw', font=self.fonts['small'], fill=_TEXT_SECONDARY),
+            # Battery Right Side (x follows the canvas width)
+            'percent': canvas.create_text(0, pad + 20, anchor='e', font=self.fonts['ios_percent'], fill=_TEXT),
+            # Detail Row (Health)
+            'health': canvas.create_text(pad, 0, anchor='nw', font=self.fonts['small_bold'], fill=COLORS['accent_green']),
+            # Capacity Information
+            'capacity': canvas.create_text(pad, 0, anchor='nw', font=self.fonts['small'], fill=_TEXT_SECONDARY),
+            # Progress Bar for iOS: (percentage, is_charging, y) or None when hidden
+            'progress': None,
+            # Device data not yet drawn because the card was off-screen
+            'pending': None,
+        }
+        canvas.bind('<Configure>', lambda e, c=card: self.layout_ios_card(c, e.width))
+        return card
+    
+    def update_ios_card(self, card, device):
+        canvas = card['frame']
+        pad = 20
+        
         dev_type = device.get('model', 'iPhone')
         icon = "📱" if "iPhone" in dev_type else "IPad" if "iPad" in dev_type else "device"
-        tk.Label(top_row, text=icon, font=("Apple Color Emoji", 24), bg=COLORS['card_bg']).pack(side='left', padx=(0, 10))
-
-        # Info
-        info_frame = tk.Frame(top_row, bg=COLORS['card_bg'])
-        info_frame.pack(side='left', fill='x', expand=True)
-        
-        tk.Label(info_frame, text=device.get('name', 'iOS Device'), font=('Helvetica', 14, 'bold'), bg=COLORS['card_bg'], fg=COLORS['text']).pack(anchor='w')
-        tk.Label(info_frame, text=f"{device.get('model', '')} • iOS {device.get('ios_version', '')}", font=('Helvetica', 11), bg=COLORS['card_bg'], fg=COLORS['text_secondary']).pack(anchor='w')
+        self.set_text(canvas, icon, card['icon'])
+        self.set_text(canvas, device.get('name', 'iOS Device'), card['name'])
+        self.set_text(canvas, f"{device.get('model', '')} • iOS {device.get('ios_version', '')}", card['model'])
 
-        # Battery Right Side
         cap = device.get('battery_capacity', 'N/A')
-        if cap != 'N/A':
-            tk.Label(top_row, text=f"{cap}%", font=('Helvetica', 20, 'bold'), bg=COLORS['card_bg'], fg=COLORS['text']).pack(side='right')
-
-        # Progress Bar for iOS
-        if cap != 'N/A':
-            try:
-                cap_val = int(float(cap))
-                self.draw_mini_progress(card, cap_val, device.get('battery_charging') == 'True')
-            except:
-                pass
-
-        # Detail Row (Health)
-        if 'battery_health' in device:
-            health_frame = tk.Frame(card, bg=COLORS['card_bg'], pady=5)
-            health_frame.pack(fill='x')
-            h_val = device['battery_health']
-            tk.Label(health_frame, text=f"Health: {h_val}%", font=('Helvetica', 11, 'bold'), bg=COLORS['card_bg'], fg=COLORS['accent_green']).pack(side='left')
+        has_cap = cap != 'N/A'
+        if has_cap:
+            self.set_text(canvas, f"{cap}%", card['percent'])
+        canvas.itemconfigure(card['percent'], state='normal' if has_cap else 'hidden')
         
-        # Capacity Information
-        capacity_frame = tk.Frame(card, bg=COLORS['card_bg'], pady=5)
-        capacity_frame.pack(fill='x')
+        # Rows below the top row are stacked from y downwards
+        y = pad + 50
         
-        if 'nominal_charge_capacity' in device and device['nominal_charge_capacity'] != 'Unknown':
-            tk.Label(capacity_frame, text=f"Max Capacity: {device['nominal_charge_capacity']} mAh", font=('Helvetica', 11), bg=COLORS['card_bg'], fg=COLORS['text_secondary']).pack(side='left')
+        # Parsed once by BatteryMonitor when the device list is collected
+        level = device.get('battery_level')
+        cap_val = int(level) if has_cap and level is not None else None
+        if cap_val is not None:
+            card['progress'] = (cap_val, device.get('battery_charging') == 'True', y + 5)
+            y += 11
+        else:
+            card['progress'] = None
+            canvas.itemconfigure('progress', state='hidden')
         
-        if 'design_capacity' in device and device['design_capacity'] != 'Unknown':
-            tk.Label(capacity_frame, text=f"Design: {device['design_capacity']} mAh", font=('Helvetica', 11), bg=COLORS['card_bg'], fg=COLORS['text_secondary']).pack(side='left', padx=(10, 0))
-
+        has_health = 'battery_health' in device
+        if has_health:
+            self.set_text(canvas, f"Health: {device['battery_health']}%", card['health'])
+            canvas.itemconfigure(card['health'], state='normal')
+            canvas.coords(card['health'], pad, y + 5)
+            y += 26
+        else:
+            canvas.itemconfigure(card['health'], state='hidden')
+        
+        parts = []
+        max_cap = device.get('nominal_charge_capacity', 'Unknown')
+        design_cap = device.get('design_capacity', 'Unknown')
+        if max_cap != 'Unknown':
+            parts.append(f"Max Capacity: {max_cap} mAh")
+        if design_cap != 'Unknown':
+            parts.append(f"Design: {design_cap} mAh")
+        self.set_text(canvas, '   '.join(parts), card['capacity'])
+        canvas.coords(card['capacity'], pad, y + 5)
+        y += 26 if parts else 10
+        
+        height = y + pad
+        if int(canvas.cget('height')) != height:
+            canvas.configure(height=height)
+        self.layout_ios_card(card, canvas.winfo_width())
+    
+    def layout_ios_card(self, card, width):
+        """Position the width-dependent items of an iOS card (right-aligned %, centered progress bar)"""
+        canvas = card['frame']
+        canvas.coords(card['percent'], width - 20, 40)
+        if card['progress'] is not None:
+            percentage, is_charging, y = card['progress']
+            self.draw_mini_progress(canvas, percentage, is_charging, x=max((width - 300) / 2, 20), y=y)
+    
     def create_empty_state_card(self, message):
-        card = self.create_card_frame(self.content_frame)
+        card = self.create_card_frame(self.ios_container)
         card.pack(fill='x', pady=(0, 10))
-        tk.Label(card, text="🔍", font=("Arial", 24), bg=COLORS['card_bg']).pack(pady=(0,5))
-        tk.Label(card, text=message, font=('Helvetica', 12), bg=COLORS['card_bg'], fg=COLORS['text_secondary']).pack()
-
-    def add_detail_row(self, parent, label, value):
-        row = tk.Frame(parent, bg=COLORS['card_bg'])
-        row.pack(fill='x', pady=2)
-        tk.Label(row, text=label, font=('Helvetica', 11), bg=COLORS['card_bg'], fg=COLORS['text_secondary']).pack(side='left')
-        tk.Label(row, text=value, font=('Helvetica', 11, 'bold'), bg=COLORS['card_bg'], fg=COLORS['text']).pack(side='right')
-
-    def draw_battery_bar(self, parent, percentage, is_charging):
-        # Canvas based modern battery bar
+        tk.Label(card, text="🔍", font=self.fonts['empty_icon'], bg=_CARD_BG).pack(pady=(0,5))
+        tk.Label(card, text=message, font=self.fonts['body'], bg=_CARD_BG, fg=_TEXT_SECONDARY).pack()
+        return card
+    
+    def set_text(self, widget, text, item=None):
+        """Set a Label's text (or a canvas text item's), skipping the Tcl call when it is unchanged"""
+        key = (widget, item)
+        if self._text_cache.get(key) == text:
+            return
+        self._text_cache[key] = text
+        if item is None:
+            widget.configure(text=text)
+        else:
+            widget.itemconfigure(item, text=text)
+
+    def set_visible(self, widget, visible, **pack_options):
+        """Pack or pack_forget a widget, touching the geometry manager only on change"""
+        if not visible:
+            if widget.winfo_manager():
+                widget.pack_forget()
+        elif not widget.winfo_manager():
+            widget.pack(**pack_options)
+    
+    def ensure_row(self, section, parent, label, value):
+        """
+        Show a label/value detail row, creating it on first use and only
+        reconfiguring its text afterwards. A value of None hides the row.
+        """
+        key = (section, label)
+        row = self._row_widgets.get(key)
+        if row is None:
+            # Rows keep the grid row of their first appearance, so section order survives hiding
+            rows = self._section_rows.setdefault(section, [])
+            row = self._row_widgets[key] = DetailRow(parent, len(rows), label,
+                                                     self.fonts['small'], self.fonts['small_bold'])
+            rows.append(key)
+
+        if value is not None:
+            row.set(value)
+        row.set_visible(value is not None)
+    
+    def draw_battery_bar(self, canvas, percentage, is_charging):
+        # Canvas based modern battery bar; items are created once and then moved/recolored
         h = 24
         w = 300 # Fixed width for stability
-        canvas = Canvas(parent, height=h, width=w, bg=COLORS['card_bg'], highlightthickness=0)
-        canvas.pack(pady=10)
-        
-        # Determine Color
-        if percentage <= 20 and not is_charging:
-            color = COLORS['accent_red']
-        elif percentage <= 50 and not is_charging:
-            color = COLORS['accent_yellow']
-        else:
-            color = COLORS['accent_green']
-            
+        
+        # Determine Color (always green while charging)
         if is_charging:
             color = COLORS['accent_green']
-
-        # Background Track
-        canvas.create_rectangle(0, 0, w, h, fill='#E5E5EA', outline='')
+        else:
+            color = _BAR_COLOR_TABLE[min(max(percentage, 0), 100)]
         
-        # Fill
-        fill_width = (w * percentage) / 100
-        canvas.create_rectangle(0, 0, fill_width, h, fill=color, outline='')
+        items = self._canvas_items.get(canvas)
+        if items is None:
+            items = self._canvas_items[canvas] = {
+                # Background Track
+                'track': canvas.create_rectangle(0, 0, w, h, fill='#E5E5EA', outline=''),
+                # Fill
+                'fill': canvas.create_rectangle(0, 0, 0, h, outline=''),
+                # Bolt Icon (hidden unless charging)
+                'bolt': canvas.create_text(w/2, h/2, text="⚡", font=self.fonts['bolt'], fill="white"),
+            }
         
-        # Bolt Icon if charging
-        if is_charging:
-            bx, by = w/2, h/2
-            canvas.create_text(bx, by, text="⚡", font=("Arial", 14), fill="white")
-
-    def draw_mini_progress(self, parent, percentage, is_charging):
+        fill_width = (w * percentage) / 100
+        canvas.coords(items['fill'], 0, 0, fill_width, h)
+        canvas.itemconfigure(items['fill'], fill=color)
+        canvas.itemconfigure(items['bolt'], state='normal' if is_charging else 'hidden')
+    
+    def draw_mini_progress(self, canvas, percentage, is_charging, x=0, y=0):
         h = 6
         w = 300
-        canvas = Canvas(parent, height=h, width=w, bg=COLORS['card_bg'], highlightthickness=0)
-        canvas.pack(pady=(5,0))
         
-        color = COLORS['accent_green']
-        if percentage <= 20: color = COLORS['accent_red']
-        if is_charging: color = COLORS['accent_green']
-
-        # Track
-        canvas.create_rectangle(0, 0, w, h, fill='#E5E5EA', outline='')
-        # Fill
+        color = _CAPACITY_COLORS[percentage > 20 or is_charging]
+        
+        items = self._canvas_items.get(canvas)
+        if items is None:
+            items = self._canvas_items[canvas] = {
+                # Track
+                'track': canvas.create_rectangle(0, 0, w, h, fill='#E5E5EA', outline='', tags='progress'),
+                # Fill
+                'fill': canvas.create_rectangle(0, 0, 0, h, outline='', tags='progress'),
+            }
+        
         fill_w = (w * percentage) / 100
-        canvas.create_rectangle(0, 0, fill_w, h, fill=color, outline='')
-
-    def draw_donut_chart(self, parent, percentage, label):
+        canvas.coords(items['track'], x, y, x + w, y + h)
+        canvas.coords(items['fill'], x, y, x + fill_w, y + h)
+        canvas.itemconfigure(items['fill'], fill=color)
+        canvas.itemconfigure('progress', state='normal')
+    
+    def draw_donut_chart(self, canvas, percentage, label):
         size = 100
-        canvas = Canvas(parent, width=size, height=size, bg=COLORS['card_bg'], highlightthickness=0)
-        canvas.pack()
         
         x, y, r = size/2, size/2, 35
         
-        # Background Ring
-        canvas.create_oval(x-r, y-r, x+r, y+r, outline='#E5E5EA', width=8)
+        items = self._canvas_items.get(canvas)
+        if items is None:
+            items = self._canvas_items[canvas] = {
+                # Background Ring
+                'ring': canvas.create_oval(x-r, y-r, x+r, y+r, outline='#E5E5EA', width=8),
+                # Foreground Arc
+                'arc': canvas.create_arc(x-r, y-r, x+r, y+r, start=90, extent=0, width=8, style='arc'),
+                # Text
+                'value': canvas.create_text(x, y, font=self.fonts['ios_title'], fill=_TEXT),
+                'label': canvas.create_text(x, y+15, font=self.fonts['caption'], fill=_TEXT_SECONDARY),
+            }
         
-        # Foreground Arc
-        start = 90
         extent = -(percentage * 360) / 100
+        color = _DONUT_COLOR_TABLE[max(0, min(100, int(percentage)))]
         
-        color = COLORS['accent_green']
-        if percentage < 80: color = COLORS['accent_yellow']
-        if percentage < 60: color = COLORS['accent_red']
-        
-        canvas.create_arc(x-r, y-r, x+r, y+r, start=start, extent=extent, outline=color, width=8, style='arc')
-        
-        # Text
-        canvas.create_text(x, y, text=f"{percentage}%", font=('Helvetica', 14, 'bold'), fill=COLORS['text'])
-        canvas.create_text(x, y+15, text=label, font=('Helvetica', 8), fill=COLORS['text_secondary'])
-
+        canvas.itemconfigure(items['arc'], extent=extent, outline=color)
+        self.set_text(canvas, f"{percentage}%", items['value'])
+        self.set_text(canvas, label, items['label'])
+    
     def get_charging_status(self, data):
-        return data.get('is_charging') == 'Yes' or data.get('charging') == 'Yes'
+        return data.get('charge_state', 0) == _CHARGE_STATE_CHARGING
 
     def get_charging_status_text(self, data):
-        if data.get('is_charging') == 'Yes' or data.get('charging') == 'Yes':
-            return "Charging"
-        if data.get('fully_charged') == 'Yes':
-            return "Full"
-        if data.get('external_connected') == 'Yes':
-            return "AC Connected"
-        return "Discharging"
+        return _STATUS_TEXT[data.get('charge_state', 0)]
 
     def show_history(self):
         try:
@@ -456,16 +910,32 @@ class ModernBatteryGUI:
         except Exception as e:
             messagebox.showerror("Error", f"Could not open history: {e}")
 
-    def save_history(self):
+    def save_history(self, mac_data, ios_devices):
+        if self._shutting_down:
+            return
         try:
-            if self.battery_monitor.battery_data:
-                self.history_manager.save_mac_battery_data(self.battery_monitor.battery_data)
-            for device in self.battery_monitor.ios_devices:
-                self.history_manager.save_ios_battery_data(device)
+            # One transaction (one commit) for the Mac record and every iOS device
+            self.history_manager.save_batch(mac_data, ios_devices)
         except Exception as e:
             print(f"Background save error: {e}")
 
+    def on_closing(self):
+        # Stop workers from marshalling calls onto a root that is about to be destroyed
+        self._shutting_down = True
+        self._work_q.put(None)
+        self._worker.join(timeout=0.5)
+        # Finish pending JSON backups and run PRAGMA optimize before the process exits
+        if self.history_manager is not None:
+            try:
+                self.history_manager.close()
+            except Exception as e:
+                print(f"Error closing history database: {e}")
+        if self.tkt is not None:
+            self.tkt.destroy()
+        self.root.destroy()
+
     def run(self):
+        self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
         self.root.mainloop()
 
 def main():
@@ -7,28 +7,23 @@ Uses Pillow to draw a battery icon, then converts via iconutil.
 import subprocess
 import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image, ImageDraw
 
 
+# Master size; every icon size is downscaled from this single drawing
+MASTER_SIZE = 1024
+
+
 def rounded_rectangle(draw, xy, radius, fill):
-    """Draw a rounded rectangle."""
+    """Draw a rounded rectangle (Pillow 8.2+ built-in)."""
     x0, y0, x1, y1 = [int(v) for v in xy]
     r = min(int(radius), (x1 - x0) // 2, (y1 - y0) // 2)
-    if r < 1 or x1 <= x0 or y1 <= y0:
-        draw.rectangle([x0, y0, x1, y1], fill=fill)
-        return
-    # Four corners
-    draw.ellipse([x0, y0, x0 + 2 * r, y0 + 2 * r], fill=fill)
-    draw.ellipse([x1 - 2 * r, y0, x1, y0 + 2 * r], fill=fill)
-    draw.ellipse([x0, y1 - 2 * r, x0 + 2 * r, y1], fill=fill)
-    draw.ellipse([x1 - 2 * r, y1 - 2 * r, x1, y1], fill=fill)
-    # Two rectangles to fill gaps
-    draw.rectangle([x0 + r, y0, x1 - r, y1], fill=fill)
-    draw.rectangle([x0, y0 + r, x1, y1 - r], fill=fill)
+    draw.rounded_rectangle([x0, y0, x1, y1], radius=max(r, 0), fill=fill)
 
 
-def create_battery_icon_png(output_path, size):
-    """Create a battery icon PNG at the given size using Pillow."""
+def render_battery_icon(size=MASTER_SIZE):
+    """Draw the battery icon at the given size and return the Pillow image."""
     img = Image.new('RGBA', (size, size), (0, 0, 0, 0))
     draw = ImageDraw.Draw(img)
 
@@ -87,7 +82,18 @@ def create_battery_icon_png(output_path, size):
     bolt = [(int(x), int(y)) for x, y in bolt]
     draw.polygon(bolt, fill='#30D158', outline='#28A745')
 
-    img.save(output_path, 'PNG')
+    return img
+
+
+def save_icon_size(base, output_path, size):
+    """Downscale the master image to size and save it as PNG."""
+    img = base if size == base.width else base.resize((size, size), Image.LANCZOS)
+    img.save(output_path, 'PNG', optimize=True)
+
+
+def create_battery_icon_png(output_path, size):
+    """Create a battery icon PNG at the given size using Pillow."""
+    render_battery_icon(size).save(output_path, 'PNG')
 
 
 def main():
@@ -95,6 +101,11 @@ def main():
     iconset_dir = os.path.join(project_dir, 'icon.iconset')
     icns_path = os.path.join(project_dir, 'icon.icns')
 
+    # The icon is fully determined by this script, so skip if it is already newer
+    if os.path.exists(icns_path) and os.path.getmtime(icns_path) >= os.path.getmtime(__file__):
+        print(f"✅ Icon is up to date: {icns_path}")
+        return
+
     # Create iconset directory
     os.makedirs(iconset_dir, exist_ok=True)
 
@@ -113,10 +124,16 @@ def main():
     ]
 
     print("🎨 Generating icon images...")
-    for filename, size in icon_specs:
-        output_path = os.path.join(iconset_dir, filename)
-        print(f"  Creating {filename} ({size}x{size})...")
-        create_battery_icon_png(output_path, size)
+    base = render_battery_icon(MASTER_SIZE)
+    # Pillow releases the GIL while resampling and encoding, so threads run in parallel
+    with ThreadPoolExecutor() as executor:
+        futures = []
+        for filename, size in icon_specs:
+            output_path = os.path.join(iconset_dir, filename)
+            print(f"  Creating {filename} ({size}x{size})...")
+            futures.append(executor.submit(save_icon_size, base, output_path, size))
+        for future in futures:
+            future.result()
 
     print("🔧 Converting to .icns...")
     subprocess.run(['iconutil', '-c', 'icns', iconset_dir, '-o', icns_path], check=True)
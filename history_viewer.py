@@ -4,14 +4,66 @@ Battery History Viewer GUI
 Battery history visualization and management tool
 """
 
+import os
+import sys
+import threading
+import time
 import tkinter as tk
 from tkinter import ttk, messagebox
-import matplotlib.pyplot as plt
+import numpy as np
+import matplotlib
+import matplotlib.dates as mdates
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure
-from datetime import datetime
 from battery_history import BatteryHistoryManager
 
+# Dense lines: merge sub-pixel segments and render long paths in chunks
+matplotlib.rcParams['path.simplify'] = True
+matplotlib.rcParams['path.simplify_threshold'] = 1.0
+matplotlib.rcParams['agg.path.chunksize'] = 10000
+
+# Above this many points markers can't be told apart and only cost draw time
+_MARKER_MAX_POINTS = 200
+
+# The query window moves with the clock, so cached history is also reused for at most this long
+_HISTORY_CACHE_SECONDS = 300
+
+
+def _lttb_indices(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+    Returns indices of n_out points of the (x-sorted) series that keep its visual shape.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    
+    # First and last points are always kept; the rest is split into n_out - 2 buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.intp)
+    indices = np.empty(n_out, dtype=np.intp)
+    indices[0] = 0
+    indices[-1] = n - 1
+    
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        # Third vertex: mean of the next bucket (the last point for the final bucket)
+        if i + 2 < len(edges):
+            next_end = edges[i + 2]
+            cx, cy = x[end:next_end].mean(), y[end:next_end].mean()
+        else:
+            cx, cy = x[-1], y[-1]
+        # Pick the point forming the largest triangle with the previous pick and that mean
+        areas = np.abs((x[a] - cx) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (cy - y[a]))
+        a = start + int(areas.argmax())
+        indices[i + 1] = a
+    
+    return indices
+
+
 class HistoryViewer:
     def __init__(self, parent=None):
         """Initialize History Viewer"""
@@ -28,8 +80,16 @@ class HistoryViewer:
         # Initialize History Manager
         self.history_manager = BatteryHistoryManager()
         
+        # Last chart query result, reused while the database files are unchanged
+        self._history_cache = None
+        self._history_cache_key = None
+        
+        # True while a reload is in flight; further Refresh clicks fold into it
+        self._load_pending = False
+        
         # Setup GUI
         self.create_widgets()
+        self.window.protocol("WM_DELETE_WINDOW", self.on_closing)
         self.load_data()
         
     def create_widgets(self):
@@ -58,90 +118,190 @@ class HistoryViewer:
         
     def create_chart(self):
         """Create chart"""
-        # Create matplotlib Figure
-        self.fig = Figure(figsize=(12, 8), dpi=100)
+        # Create matplotlib Figure, sized to the chart area of the 1000x700 window
+        # (TkAgg resizes it to the widget on every <Configure>; this avoids an oversized first render)
+        self.fig = Figure(figsize=(9.6, 5.6), dpi=100)
         self.ax = self.fig.add_subplot(1, 1, 1)
         
+        # Create secondary y-axis (cycle count) once; lines are updated in place on reload
+        self.ax2 = self.ax.twinx()
+        
+        # Data lines are animated: excluded from full draws and blitted over a cached background
+        self._health_line, = self.ax.plot([], [], 'b-', linewidth=2, marker='o', markersize=4,
+                                          label='Battery Health', animated=True)
+        self._cycle_line, = self.ax2.plot([], [], 'r-', linewidth=2, marker='s', markersize=4,
+                                          label='Cycle Count', animated=True)
+        
+        # Axis settings
+        self.ax.set_xlabel('Date', fontsize=12)
+        self.ax.set_ylabel('Battery Health (%)', color='b', fontsize=12)
+        self.ax2.set_ylabel('Cycle Count', color='r', fontsize=12)
+        
+        self.ax.set_title('Battery History (Last 30 Days)', fontsize=14, fontweight='bold')
+        
+        # Date ticks: fixed locator/formatter, so no rotated labels or layout pass per update
+        locator = mdates.AutoDateLocator(maxticks=8)
+        self.ax.xaxis.set_major_locator(locator)
+        self.ax.xaxis.set_major_formatter(mdates.ConciseDateFormatter(locator))
+        
+        # Fixed margins instead of tight_layout on every update
+        self.fig.subplots_adjust(left=0.08, right=0.92, bottom=0.1, top=0.92)
+        
+        # Grid
+        self.ax.grid(True, alpha=0.3)
+        
+        # Legend
+        self.ax.legend([self._health_line, self._cycle_line], ['Battery Health', 'Cycle Count'], loc='upper right')
+        
+        # Placeholder message for empty history
+        self._message = self.ax.text(0.5, 0.5, '', ha='center', va='center',
+                                     transform=self.ax.transAxes, fontsize=14)
+        
         # Create canvas
         self.canvas = FigureCanvasTkAgg(self.fig, self.chart_frame)
         self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
         
+        # Background (everything but the data lines), captured after each full draw
+        self._background = None
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+    
+    def _on_draw(self, event):
+        """Cache the static background and blit the data lines over it after a full draw"""
+        self._background = self.canvas.copy_from_bbox(self.fig.bbox)
+        self._blit_lines()
+    
+    def _blit_lines(self):
+        self.ax.draw_artist(self._health_line)
+        self.ax2.draw_artist(self._cycle_line)
+        self.canvas.blit(self.fig.bbox)
+    
+    def _show_message(self, message):
+        """Show a centered message instead of data"""
+        self._health_line.set_data([], [])
+        self._cycle_line.set_data([], [])
+        self._message.set_text(message)
+        self.canvas.draw_idle()
+    
     def load_data(self):
-        """Load data and update chart"""
+        """Start a data reload in the background (at most one in flight at a time)"""
+        if self._load_pending:
+            return
+        self._load_pending = True
+        
+        # Placeholder only on first load; a reload keeps the current chart until new data arrives
+        if not len(self._health_line.get_xdata()):
+            self._show_message('Loading...')
+        
+        threading.Thread(target=self._fetch_history, daemon=True).start()
+    
+    def _fetch_history(self):
+        """Worker thread: query the history, then hand the result to the Tk thread"""
         try:
             # Get Mac battery history
-            history_data = self.history_manager.get_mac_history(days=30)
+            result = (self._cached_history(30), None)
+        except Exception as e:
+            result = (None, e)
+        
+        try:
+            self.window.after(0, self._on_history_loaded, *result)
+        except (RuntimeError, tk.TclError):
+            pass  # Viewer was closed while loading
+    
+    def _on_history_loaded(self, history_data, error):
+        """Update chart with fetched data (Tk thread)"""
+        self._load_pending = False
+        try:
+            if error is not None:
+                raise error
             
-            if not history_data:
-                self.ax.clear()
-                self.ax.text(0.5, 0.5, 'No history data available\n\nPlease run Battery Monitor\nto collect data', 
-                           ha='center', va='center', transform=self.ax.transAxes, fontsize=14)
-                self.canvas.draw()
+            if not history_data or not history_data['timestamp']:
+                self._show_message('No history data available\n\nPlease run Battery Monitor\nto collect data')
                 return
             
             # Draw chart
             self.update_chart(history_data)
-            
+        
         except Exception as e:
-            messagebox.showerror("Error", f"Cannot load data: {e}")
+            # Shown on the axes instead of a modal dialog, so the window stays usable
+            print(f"Cannot load data: {e}", file=sys.stderr)
+            self._show_message(f"Cannot load data:\n{e}")
+    
+    def _cached_history(self, days):
+        """
+        Fetch the charted columns pre-aggregated by SQLite, or reuse the last result
+        if nothing was written since and the time bucket is unchanged
+        """
+        key = (days, self._db_mtimes(), int(time.time() // _HISTORY_CACHE_SECONDS))
+        if key == self._history_cache_key:
+            return self._history_cache
+        
+        history_data = self.history_manager.get_mac_history_binned(days=days)
+        # Empty results (including the {} returned on a query error) are never cached
+        if history_data and history_data['timestamp']:
+            self._history_cache, self._history_cache_key = history_data, key
+        else:
+            self._history_cache, self._history_cache_key = None, None
+        return history_data
+    
+    def _db_mtimes(self):
+        """Modification times of the database and its WAL file (in WAL mode saves only touch the -wal file)"""
+        mtimes = []
+        for path in (self.history_manager.db_path, self.history_manager.db_path + '-wal'):
+            try:
+                mtimes.append(os.stat(path).st_mtime_ns)
+            except OSError:
+                mtimes.append(None)
+        return tuple(mtimes)
     
     def update_chart(self, history_data):
-        """Update chart"""
-        self.ax.clear()
-        
-        # Prepare data
-        timestamps = []
-        health_values = []
-        cycle_values = []
-        
-        for record in history_data:
-            if record.get('timestamp') and record.get('battery_health'):
-                try:
-                    # Parse timestamp
-                    if isinstance(record['timestamp'], str):
-                        dt = datetime.fromisoformat(record['timestamp'])
-                    else:
-                        dt = record['timestamp']
-                    
-                    timestamps.append(dt)
-                    health_values.append(float(record['battery_health']))
-                    cycle_values.append(int(record.get('cycle_count', 0)))
-                except:
-                    continue
-        
-        if not timestamps:
-            self.ax.text(0.5, 0.5, 'No valid data available', ha='center', va='center', transform=self.ax.transAxes)
-            self.canvas.draw()
-            return
+        """Update chart from column tuples (timestamp, battery_health, cycle_count)"""
+        # Column tuples convert straight to arrays (missing values become NaT/NaN)
+        timestamps = np.array(history_data['timestamp'], dtype='datetime64[us]')
+        health_values = np.array(history_data['battery_health'], dtype=np.float64)
+        cycle_values = np.array(history_data['cycle_count'], dtype=np.float64)
         
-        # Battery health chart
-        self.ax.plot(timestamps, health_values, 'b-', linewidth=2, marker='o', markersize=4, label='Battery Health')
+        # Keep only rows with both a timestamp and a health value
+        valid = ~np.isnat(timestamps) & ~np.isnan(health_values) & (health_values != 0)
+        timestamps = timestamps[valid]
+        health_values = health_values[valid]
+        cycle_values = np.nan_to_num(cycle_values[valid]).astype(np.int64)
         
-        # Create secondary y-axis (cycle count)
-        ax2 = self.ax.twinx()
-        ax2.plot(timestamps, cycle_values, 'r-', linewidth=2, marker='s', markersize=4, label='Cycle Count')
+        if not timestamps.size:
+            self._show_message('No valid data available')
+            return
         
-        # Axis settings
-        self.ax.set_xlabel('Date', fontsize=12)
-        self.ax.set_ylabel('Battery Health (%)', color='b', fontsize=12)
-        ax2.set_ylabel('Cycle Count', color='r', fontsize=12)
+        # Oldest first, then reduce each series to about two points per horizontal pixel
+        order = np.argsort(timestamps, kind='stable')
+        timestamps = timestamps[order]
+        health_values = health_values[order]
+        cycle_values = cycle_values[order]
         
-        self.ax.set_title('Battery History (Last 30 Days)', fontsize=14, fontweight='bold')
+        n_out = 2 * int(self.ax.bbox.width)
+        x = timestamps.astype(np.int64)
+        health_idx = _lttb_indices(x, health_values, n_out)
+        cycle_idx = _lttb_indices(x, cycle_values, n_out)
         
-        # Grid
-        self.ax.grid(True, alpha=0.3)
+        # The message text is baked into the cached background; clearing it needs a full redraw
+        had_message = bool(self._message.get_text())
+        self._message.set_text('')
+        self._health_line.set_data(timestamps[health_idx], health_values[health_idx])
+        self._cycle_line.set_data(timestamps[cycle_idx], cycle_values[cycle_idx])
+        self._health_line.set_marker('o' if len(health_idx) < _MARKER_MAX_POINTS else 'None')
+        self._cycle_line.set_marker('s' if len(cycle_idx) < _MARKER_MAX_POINTS else 'None')
         
-        # Legend
-        lines1, labels1 = self.ax.get_legend_handles_labels()
-        lines2, labels2 = ax2.get_legend_handles_labels()
-        self.ax.legend(lines1 + lines2, labels1 + labels2, loc='upper right')
+        # Rescale to the new data; otherwise only a change in axis ranges needs a full redraw
+        limits = (self.ax.get_xlim(), self.ax.get_ylim(), self.ax2.get_ylim())
+        for ax in (self.ax, self.ax2):
+            ax.relim()
+            ax.autoscale_view()
         
-        # Date format
-        self.fig.autofmt_xdate()
+        if (had_message or self._background is None
+                or limits != (self.ax.get_xlim(), self.ax.get_ylim(), self.ax2.get_ylim())):
+            self.canvas.draw_idle()
+            return
         
-        # Layout adjustment
-        self.fig.tight_layout()
-        self.canvas.draw()
+        self.canvas.restore_region(self._background)
+        self._blit_lines()
     
     def create_backup(self):
         """Create backup"""
@@ -151,10 +311,17 @@ class HistoryViewer:
         except Exception as e:
             messagebox.showerror("Backup Error", f"Cannot create backup: {e}")
     
+    def on_closing(self):
+        """Close the history database, then the window"""
+        try:
+            self.history_manager.close()
+        except Exception as e:
+            print(f"Error closing history database: {e}", file=sys.stderr)
+        self.window.destroy()
+    
     def run(self):
         """Run application"""
         if not self.parent:
-            self.window.protocol("WM_DELETE_WINDOW", self.window.quit)
             self.window.mainloop()
 
 def main():
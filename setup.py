@@ -7,6 +7,7 @@ from setuptools import setup
 import os
 import sys
 import glob
+import re
 
 APP = ['battery_monitor_gui.py']
 DATA_FILES = []
@@ -15,58 +16,62 @@ DATA_FILES = []
 if os.path.exists('icon.icns'):
     DATA_FILES.append(('', ['icon.icns']))
 
+# Debug builds (BATMON_DEBUG=1) keep unoptimized bytecode and dylib symbols
+DEBUG = os.environ.get('BATMON_DEBUG') == '1'
+
 # Get the directory containing this setup.py
 setup_dir = os.path.dirname(os.path.abspath(__file__))
 
-# Find libffi library automatically
-libffi_path = None
-# Common locations for libffi on macOS
-possible_paths = [
-    # Python framework location
-    os.path.join(os.path.dirname(sys.executable), '../lib/libffi.8.dylib'),
-    os.path.join(os.path.dirname(sys.executable), '../lib/libffi.dylib'),
-    # Homebrew
-    '/opt/homebrew/lib/libffi.8.dylib',
-    '/opt/homebrew/lib/libffi.dylib',
-    # MacPorts / Local
-    '/usr/local/lib/libffi.8.dylib',
-    '/usr/local/lib/libffi.dylib',
-    # System
-    '/usr/lib/libffi.dylib',
-]
+# Library directory of the running Python (framework / Conda)
+python_lib_dir = os.path.join(os.path.dirname(sys.executable), '..', 'lib')
+
+
+def _version_key(path):
+    """Numeric version parts of a dylib name, e.g. libtk8.6.dylib -> (8, 6)"""
+    return tuple(int(part) for part in re.findall(r'\d+', os.path.basename(path)))
+
+
+def find_library(versioned_pattern, fallback_name, search_dirs):
+    """
+    Return the highest-versioned dylib matching versioned_pattern, else fallback_name,
+    searching directories in order (None if absent)
+    """
+    for directory in search_dirs:
+        matches = glob.glob(os.path.join(directory, versioned_pattern))
+        if matches:
+            return max(matches, key=_version_key)
+        fallback = os.path.join(directory, fallback_name)
+        if os.path.exists(fallback):
+            return fallback
+    return None
+
 
 frameworks = []
+
+# Find libffi library automatically
+# Common locations for libffi on macOS: Python framework, Homebrew, MacPorts / Local, System
+# (libffi.[0-9]* skips e.g. /usr/lib/libffi-trampolines.dylib)
 print("Searching for libffi...")
-for path in possible_paths:
-    if os.path.exists(path):
-        print(f"✅ Found libffi at: {path}")
-        frameworks.append(path)
-        break
+libffi_path = find_library('libffi.[0-9]*.dylib', 'libffi.dylib',
+                           [python_lib_dir, '/opt/homebrew/lib', '/usr/local/lib', '/usr/lib'])
+if libffi_path:
+    print(f"✅ Found libffi at: {libffi_path}")
+    frameworks.append(libffi_path)
 else:
     print("⚠️  Warning: libffi not found in standard locations.")
 
-# Also find Tcl/Tk libraries for Conda environments
-tcl_tk_paths = [
-    os.path.join(os.path.dirname(sys.executable), '../lib/libtk8.6.dylib'),
-    os.path.join(os.path.dirname(sys.executable), '../lib/libtcl8.6.dylib'),
-]
-
+# Also find Tcl/Tk and sqlite3 libraries for Conda environments
 print("Searching for Tcl/Tk libraries...")
-for path in tcl_tk_paths:
-    if os.path.exists(path):
-        print(f"✅ Found Tcl/Tk lib at: {path}")
+for name, pattern, fallback_name in (('Tcl/Tk', 'libtk[0-9].[0-9]*.dylib', 'libtk.dylib'),
+                                     ('Tcl/Tk', 'libtcl[0-9].[0-9]*.dylib', 'libtcl.dylib'),
+                                     ('sqlite3', 'libsqlite3.[0-9]*.dylib', 'libsqlite3.dylib')):
+    path = find_library(pattern, fallback_name, [python_lib_dir])
+    if path:
+        print(f"✅ Found {name} lib at: {path}")
         frameworks.append(path)
     else:
-        print(f"⚠️  Could not find: {path}")
-
-# Also find sqlite3 library for Conda environments
-sqlite_path = os.path.join(os.path.dirname(sys.executable), '../lib/libsqlite3.0.dylib')
-if os.path.exists(sqlite_path):
-    print(f"✅ Found sqlite3 lib at: {sqlite_path}")
-    frameworks.append(sqlite_path)
-else:
-    print(f"⚠️  Could not find sqlite3 at: {sqlite_path}")
-
+        print(f"⚠️  Could not find {pattern} in: {python_lib_dir}")
+    
 OPTIONS = {
     'argv_emulation': False,
     'iconfile': 'icon.icns' if os.path.exists('icon.icns') else None,  # Battery monitor icon
@@ -77,23 +82,15 @@ OPTIONS = {
         'ctypes',
         '_ctypes',
         'sqlite3',
-        'pathlib',
-        'typing',
-        'threading',
-        'subprocess',
-        'json',
-        're',
-        'shutil',
-        'datetime',
         'battery_monitor',
         'battery_history',
-    ],  # Explicitly include required modules
+    ],  # Explicitly include required modules (plain stdlib imports are found by modulegraph)
     'packages': [],  # Empty - matplotlib loaded dynamically
     'frameworks': frameworks,  # Include necessary dylibs
     'excludes': ['matplotlib', 'numpy', 'pandas', 'PIL', 'PyQt5', 'PyQt6', 'test', 'unittest'],  # Exclude unnecessary modules
     'site_packages': False,  # Create standalone app
-    'optimize': 0,  # Disable optimization for better debugging
-    'strip': False,  # Don't strip symbols for better debugging
+    'optimize': 0 if DEBUG else 2,  # Release: -OO bytecode (no asserts/docstrings)
+    'strip': not DEBUG,  # Release: strip debug symbols from bundled binaries
     'plist': {
         'CFBundleName': 'Battery Monitor',
         'CFBundleDisplayName': 'Battery Monitor',
@@ -0,0 +1,52 @@
+"""BatteryHistoryManager 저장/롤백 테스트 (python -m unittest discover tests)"""
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from battery_history import BatteryHistoryManager
+
+
+class SaveBatchTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.manager = BatteryHistoryManager(str(Path(self._tmp_dir.name) / 'test.db'))
+    
+    def tearDown(self):
+        self.manager.close()
+        self._tmp_dir.cleanup()
+    
+    def test_rolled_back_device_key_is_not_reused(self):
+        # 롤백된 트랜잭션에서 등록한 디바이스 키가 캐시에 남으면 다른 디바이스와 키가 섞임
+        with self.assertRaises(RuntimeError):
+            with self.manager.transaction():
+                self.manager._get_ios_device_key('dev-A')
+                raise RuntimeError('rollback')
+        
+        self.assertTrue(self.manager.save_batch(None, [{'device_id': 'dev-B', 'name': 'B'}]))
+        self.assertTrue(self.manager.save_batch(None, [{'device_id': 'dev-A', 'name': 'A'}]))
+        
+        self.assertEqual([row['device_name'] for row in self.manager.get_ios_history('dev-A')], ['A'])
+        self.assertEqual([row['device_name'] for row in self.manager.get_ios_history('dev-B')], ['B'])
+    
+    def test_bad_device_does_not_drop_batch(self):
+        mac_data = {'device_name': 'MacBook Pro', 'design_capacity': '5000',
+                    'apple_raw_max_capacity': '4800', 'cycle_count': '150'}
+        ios_devices = [
+            {'device_id': 'dev-A', 'name': {'bad': 1}},  # 바인딩 불가 값
+            'not a dict',
+            {'device_id': 'dev-B', 'name': 'B'},
+        ]
+        
+        self.assertTrue(self.manager.save_batch(mac_data, ios_devices))
+        
+        self.assertEqual(len(self.manager.get_mac_history(days=1)), 1)
+        self.assertEqual(self.manager.get_ios_history('dev-A'), [])
+        self.assertEqual(len(self.manager.get_ios_history('dev-B')), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()